@@ -1,7 +1,10 @@
 from http.server import BaseHTTPRequestHandler
-import json
 import sys
 import os
+import functools
+import itertools
+
+import orjson
 
 try:
     from langchain_core.prompts import PromptTemplate
@@ -11,37 +14,60 @@ except ImportError as e:
     print(f"Warning: LangChain import failed: {e}", file=sys.stderr)
     LANGCHAIN_AVAILABLE = False
 
-# Global model rotation tracker (persists across requests in same container)
-_global_model_tracker = {
-    'current_index': 0,
-    'models': [
-        "gemini-2.0-flash-lite",
-        "gemini-2.0-flash",
-        "gemini-2.5-flash-lite",
-        "gemini-2.5-flash"
-    ]
-}
+# Model rotation (persists across requests in same container)
+MODELS = (
+    "gemini-2.0-flash-lite",
+    "gemini-2.0-flash",
+    "gemini-2.5-flash-lite",
+    "gemini-2.5-flash"
+)
+_model_iter = itertools.cycle(MODELS)
 
 def get_next_model():
     """Get next model in round-robin rotation to avoid rate limits"""
-    model = _global_model_tracker['models'][_global_model_tracker['current_index']]
-    _global_model_tracker['current_index'] = (
-        _global_model_tracker['current_index'] + 1
-    ) % len(_global_model_tracker['models'])
+    return next(_model_iter)
+
+# GenerativeModel wrappers and API configuration, reused across requests in same container
+_model_cache = {}
+_configured_api_key = None
+
+def configure_gemini(api_key: str):
+    """Configure the Gemini client once per container (or when the key changes)"""
+    global _configured_api_key
+    if _configured_api_key != api_key:
+        genai.configure(api_key=api_key)
+        _configured_api_key = api_key
+
+def get_model(model_name: str):
+    """Get a cached GenerativeModel instance for the given model name"""
+    model = _model_cache.get(model_name)
+    if model is None:
+        model = _model_cache[model_name] = genai.GenerativeModel(model_name)
     return model
 
-def call_gemini_sync(prompt: str, model_name: str = None) -> str:
-    """Call Gemini API synchronously with specified or next available model"""
+def call_gemini_sync(prompt: str, model_name: str = None, response_schema: dict = None) -> str:
+    """Call Gemini API synchronously with specified or next available model
+    
+    When response_schema is given, Gemini's JSON mode constrains the output
+    to that schema so it can be parsed directly.
+    """
     if model_name is None:
         model_name = get_next_model()
         
     try:
-        model = genai.GenerativeModel(model_name)
+        model = get_model(model_name)
+        json_mode = {}
+        if response_schema is not None:
+            json_mode = {
+                'response_mime_type': 'application/json',
+                'response_schema': response_schema
+            }
         response = model.generate_content(
             prompt,
             generation_config=genai.types.GenerationConfig(
                 temperature=0.3,
-                max_output_tokens=2048
+                max_output_tokens=2048,
+                **json_mode
             )
         )
         return response.text.strip()
@@ -49,9 +75,9 @@ def call_gemini_sync(prompt: str, model_name: str = None) -> str:
         print(f"Gemini API error with {model_name}: {str(e)}", file=sys.stderr)
         raise
 
-def generate_ground_truth(question: str, contexts: list) -> str:
-    """Generate ground truth answer from contexts (matching langchain_dataset_generator.py)"""
-    prompt_template = PromptTemplate(
+# Prompt templates are built once at import rather than on every call
+if LANGCHAIN_AVAILABLE:
+    GROUND_TRUTH_TEMPLATE = PromptTemplate(
         input_variables=["question", "context"],
         template="""Based on the following context, provide a comprehensive and accurate answer to the question.
 
@@ -62,21 +88,25 @@ Question: {question}
 
 Provide a detailed, factual answer based solely on the information in the context:"""
     )
-    
+
+@functools.lru_cache(maxsize=512)
+def _cached_ground_truth(question: str, context_text: str) -> str:
+    """Generate ground truth, memoized per container (failures raise and are not cached)"""
+    prompt = GROUND_TRUTH_TEMPLATE.format(question=question, context=context_text)
+    return call_gemini_sync(prompt)
+
+def generate_ground_truth(question: str, contexts: list) -> str:
+    """Generate ground truth answer from contexts (matching langchain_dataset_generator.py)"""
     try:
-        context_text = "\n\n".join(contexts)
-        prompt = prompt_template.format(question=question, context=context_text)
-        response = call_gemini_sync(prompt)
-        
-        return response
+        return _cached_ground_truth(question, "\n\n".join(contexts))
         
     except Exception as e:
         print(f"Error generating ground truth: {str(e)}", file=sys.stderr)
         return "Ground truth generation failed"
 
-def generate_test_questions(contexts: list, num_questions: int = 3) -> list:
-    """Generate diverse test questions from contexts (matching langchain_dataset_generator.py)"""
-    prompt_template = PromptTemplate(
+# Prompt template for generate_test_questions
+if LANGCHAIN_AVAILABLE:
+    TEST_QUESTIONS_TEMPLATE = PromptTemplate(
         input_variables=["context", "num_questions"],
         template="""Based on the following context, generate {num_questions} diverse and meaningful questions that can be answered using this context.
 
@@ -85,28 +115,36 @@ Context:
 
 Generate {num_questions} questions (one per line):"""
     )
+
+@functools.lru_cache(maxsize=512)
+def _cached_test_questions(context_text: str, num_questions: int) -> tuple:
+    """Generate test questions, memoized per container as an immutable tuple"""
+    prompt = TEST_QUESTIONS_TEMPLATE.format(context=context_text, num_questions=num_questions)
+    response = call_gemini_sync(prompt)
     
+    questions = [q.strip() for q in response.split('\n') if q.strip()]
+    return tuple(questions[:num_questions])
+
+def generate_test_questions(contexts: list, num_questions: int = 3) -> list:
+    """Generate diverse test questions from contexts (matching langchain_dataset_generator.py)"""
     try:
-        context_text = "\n\n".join(contexts)
-        prompt = prompt_template.format(context=context_text, num_questions=num_questions)
-        response = call_gemini_sync(prompt)
-        
-        questions = [q.strip() for q in response.split('\n') if q.strip()]
-        return questions[:num_questions]
+        return list(_cached_test_questions("\n\n".join(contexts), num_questions))
         
     except Exception as e:
         print(f"Error generating test questions: {str(e)}", file=sys.stderr)
         return []
 
-def generate_comprehensive_feedback(
-    question: str,
-    answer: str,
-    contexts: list,
-    ragas_scores: dict,
-    rag_mode: str = 'basic'
-) -> dict:
-    """Generate comprehensive feedback (matching langchain_dataset_generator.py exactly)"""
-    prompt_template = PromptTemplate(
+# JSON-mode schema for comprehensive feedback: every section is plain text
+FEEDBACK_FIELDS = ['overall_assessment', 'strengths', 'weaknesses', 'recommendations', 'context_analysis']
+FEEDBACK_SCHEMA = {
+    'type': 'object',
+    'properties': {key: {'type': 'string'} for key in FEEDBACK_FIELDS},
+    'required': FEEDBACK_FIELDS
+}
+
+# Prompt template for generate_comprehensive_feedback
+if LANGCHAIN_AVAILABLE:
+    FEEDBACK_TEMPLATE = PromptTemplate(
         input_variables=["question", "answer", "contexts", "scores", "mode"],
         template="""You are an expert RAG system evaluator. Analyze the following RAG system output and provide comprehensive, human-readable feedback.
 
@@ -133,12 +171,20 @@ Provide:
 
 Format as JSON with string values only - NO nested objects, NO arrays, NO structured data within the strings. Write naturally as if explaining to a human reader."""
     )
-    
+
+def generate_comprehensive_feedback(
+    question: str,
+    answer: str,
+    contexts: list,
+    ragas_scores: dict,
+    rag_mode: str = 'basic'
+) -> dict:
+    """Generate comprehensive feedback (matching langchain_dataset_generator.py exactly)"""
     try:
-        contexts_text = "\n\n".join([f"Context {i+1}: {ctx}" for i, ctx in enumerate(contexts)])
-        scores_text = "\n".join([f"- {metric}: {score:.3f}" for metric, score in ragas_scores.items()])
+        contexts_text = "\n\n".join(f"Context {i}: {ctx}" for i, ctx in enumerate(contexts, 1))
+        scores_text = "\n".join(f"- {metric}: {score:.3f}" for metric, score in ragas_scores.items())
         
-        prompt = prompt_template.format(
+        prompt = FEEDBACK_TEMPLATE.format(
             question=question,
             answer=answer,
             contexts=contexts_text,
@@ -146,36 +192,13 @@ Format as JSON with string values only - NO nested objects, NO arrays, NO struct
             mode=rag_mode.upper()
         )
         
-        response = call_gemini_sync(prompt)
-        content = response
+        content = call_gemini_sync(prompt, response_schema=FEEDBACK_SCHEMA)
         
-        # Try to parse as JSON
+        # JSON mode returns bare JSON with string values only
         try:
-            # Remove markdown code blocks if present
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
-            
-            feedback = json.loads(content)
-            
-            # Ensure all values are strings (convert any nested objects/arrays to readable text)
-            for key in ['overall_assessment', 'strengths', 'weaknesses', 'recommendations', 'context_analysis']:
-                if key in feedback:
-                    value = feedback[key]
-                    if isinstance(value, dict):
-                        # Convert dict to readable text
-                        feedback[key] = ". ".join([f"{k}: {v}" for k, v in value.items()])
-                    elif isinstance(value, list):
-                        # Convert list to readable text
-                        feedback[key] = ". ".join([str(item) if isinstance(item, str) else json.dumps(item) for item in value])
-                    elif not isinstance(value, str):
-                        # Convert any other type to string
-                        feedback[key] = str(value)
+            return orjson.loads(content)
             
-            return feedback
-            
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             # Fallback: structure the text response
             return {
                 "overall_assessment": "Evaluation completed successfully",
@@ -195,26 +218,39 @@ Format as JSON with string values only - NO nested objects, NO arrays, NO struct
             "context_analysis": f"Contexts retrieved: {len(contexts)}"
         }
 
+# Static error payload, serialized once at import
+_UNAVAILABLE_BYTES = orjson.dumps({
+    'error': 'LangChain not available',
+    'fallback': 'Operation failed'
+})
+
 class handler(BaseHTTPRequestHandler):
+    def _respond(self, code: int, body: bytes):
+        """Write status line, headers and JSON body with a single write call"""
+        self.log_request(code)
+        head = (
+            f"{self.protocol_version} {code} {self.responses[code][0]}\r\n"
+            f"Server: {self.version_string()}\r\n"
+            f"Date: {self.date_time_string()}\r\n"
+            "Content-type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        )
+        self.wfile.write(head.encode('latin-1') + body)
+        self.wfile.flush()
+    
     def do_POST(self):
         """Vercel serverless function handler for LangChain dataset generation and feedback"""
         try:
             # Read request body
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = orjson.loads(post_data)
             
             operation = data.get('operation', 'generate_feedback')
             
             if not LANGCHAIN_AVAILABLE:
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                error_result = {
-                    'error': 'LangChain not available',
-                    'fallback': 'Operation failed'
-                }
-                self.wfile.write(json.dumps(error_result).encode())
+                self._respond(500, _UNAVAILABLE_BYTES)
                 return
             
             # Initialize Gemini
@@ -222,7 +258,7 @@ class handler(BaseHTTPRequestHandler):
             if not gemini_api_key:
                 raise ValueError('GEMINI_API_KEY environment variable not set')
             
-            genai.configure(api_key=gemini_api_key)
+            configure_gemini(gemini_api_key)
             
             # Handle different operations
             if operation == "generate_ground_truth":
@@ -255,30 +291,19 @@ class handler(BaseHTTPRequestHandler):
                 result = {"error": f"Unknown operation: {operation}"}
             
             # Send response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
+            self._respond(200, orjson.dumps(result))
             
         except Exception as e:
             # Error response
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            
             error_result = {
                 "error": str(e),
                 "fallback": "Operation failed"
             }
             
-            self.wfile.write(json.dumps(error_result).encode())
+            self._respond(500, orjson.dumps(error_result))
     
     def do_GET(self):
         """Health check endpoint"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        
         health = {
             'status': 'ok',
             'langchain_available': LANGCHAIN_AVAILABLE,
@@ -286,4 +311,4 @@ class handler(BaseHTTPRequestHandler):
             'operations': ['generate_ground_truth', 'generate_questions', 'generate_feedback']
         }
         
-        self.wfile.write(json.dumps(health).encode())
+        self._respond(200, orjson.dumps(health))
@@ -1,17 +1,34 @@
-from http.server import BaseHTTPRequestHandler
 import json
 import sys
 import os
+import asyncio
+import copy
+import functools
+import hashlib
+import math
+from collections import OrderedDict
+from typing import List, Optional
 
-# Add parent directory to path to import evaluation modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'python_evaluators'))
+import msgspec
+import orjson
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
+
+# Add the sibling python_evaluators package to path to import evaluation modules
+_PKG = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_evaluators'))
+if not os.path.isdir(_PKG):
+    print(f"Warning: evaluation modules not found at {_PKG}", file=sys.stderr)
+elif _PKG not in sys.path:
+    sys.path.insert(0, _PKG)
 
 try:
     from ragas import evaluate
     from ragas.metrics import faithfulness, answer_relevancy, context_precision, context_recall, answer_correctness
     from ragas.llms import LangchainLLMWrapper
+    from ragas.run_config import RunConfig
     from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
     from datasets import Dataset
+    from google.api_core.exceptions import ResourceExhausted
     import warnings
     warnings.filterwarnings('ignore')
     RAGAS_AVAILABLE = True
@@ -38,197 +55,328 @@ def get_next_model():
     ) % len(_global_model_tracker['models'])
     return model
 
-class handler(BaseHTTPRequestHandler):
-    def do_POST(self):
-        """Vercel serverless function handler for RAGAS evaluation"""
-        try:
-            # Read request body
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
-            
-            question = data.get('question', '')
-            answer = data.get('answer', '')
-            contexts = data.get('contexts', [])
-            ground_truth = data.get('ground_truth', answer)
-            rag_mode = data.get('rag_mode', 'basic')
-            
-            if not RAGAS_AVAILABLE:
-                # Return fallback metrics
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                
-                fallback_result = {
-                    'faithfulness': 0.75,
-                    'answer_relevancy': 0.75,
-                    'context_precision': 0.75,
-                    'context_recall': 0.75,
-                    'context_relevance': 0.75,
-                    'answer_correctness': 0.75,
-                    'error': 'RAGAS not available, using fallback values'
-                }
-                
-                self.wfile.write(json.dumps(fallback_result).encode())
-                return
-            
-            # Initialize Gemini LLM for RAGAS with model rotation
-            gemini_api_key = os.environ.get('GEMINI_API_KEY')
-            if not gemini_api_key:
-                raise ValueError('GEMINI_API_KEY environment variable not set')
-            
-            # Initialize Google embeddings (lightweight, no large ML models needed)
-            embeddings = GoogleGenerativeAIEmbeddings(
-                model="models/embedding-004",
-                google_api_key=gemini_api_key
-            )
-            
-            # Create dataset for RAGAS
-            dataset_dict = {
-                'question': [question],
-                'answer': [answer],
-                'contexts': [contexts],
-                'ground_truth': [ground_truth]
-            }
-            
-            dataset = Dataset.from_dict(dataset_dict)
-            
-            # Select metrics based on mode (matching ragas_evaluator.py exactly)
-            # Note: answer_correctness added to match Python version
-            if rag_mode == 'advanced':
-                metrics_config = [
-                    ('faithfulness', faithfulness),
-                    ('answer_relevancy', answer_relevancy),
-                    ('context_precision', context_precision),
-                    ('context_recall', context_recall),
-                    ('answer_correctness', answer_correctness),
-                ]
-            else:  # basic mode - faster metrics
-                metrics_config = [
-                    ('faithfulness', faithfulness),
-                    ('context_precision', context_precision),
-                    ('context_recall', context_recall),
-                ]
-            
-            print(f"📊 Evaluating {len(metrics_config)} RAGAS metrics with model rotation...", file=sys.stderr)
-            
-            # Evaluate each metric separately with model rotation (matching ragas_evaluator.py)
-            all_scores = {}
-            for metric_name, metric in metrics_config:
-                try:
-                    # Get next model in rotation and create LLM
-                    current_model = get_next_model()
-                    llm = ChatGoogleGenerativeAI(
-                        model=current_model,
-                        google_api_key=gemini_api_key,
-                        temperature=0.1,
-                        max_output_tokens=16384,  # Matching ragas_evaluator.py
-                        convert_system_message_to_human=True,
-                        response_mime_type="application/json"
-                    )
-                    
-                    # Configure metric with LLM
-                    metric.llm = llm
-                    
-                    print(f"  📈 {metric_name}: {current_model}", file=sys.stderr)
-                    print(f"PROGRESS: Evaluating {metric_name} with {current_model}", flush=True)
-                    
-                    # Evaluate this single metric
-                    result = evaluate(
-                        dataset=dataset,
-                        metrics=[metric],
-                        embeddings=embeddings,
-                        show_progress=False
-                    )
-                    
-                    # Extract score from RAGAS result
-                    score = None
-                    if hasattr(result, 'to_pandas'):
-                        df = result.to_pandas()
-                        
-                        # Try different column name variations
-                        possible_names = [
-                            metric_name,
-                            f"nv_{metric_name}",
-                            metric_name.replace('_', ''),
-                        ]
-                        
-                        for name in possible_names:
-                            if name in df.columns:
-                                raw_score = df[name].iloc[0]
-                                if raw_score is not None and not (isinstance(raw_score, float) and raw_score != raw_score):
-                                    score = float(raw_score)
-                                    if name != metric_name:
-                                        print(f"    ℹ️  Found as '{name}' in result", file=sys.stderr)
-                                    break
-                    
-                    # Store score
-                    if score is not None:
-                        all_scores[metric_name] = score
-                        print(f"PROGRESS: {metric_name} completed with score {score:.4f}", flush=True)
-                        print(f"    ✅ {metric_name} = {score:.4f}", file=sys.stderr)
-                    else:
-                        print(f"    ⚠️  {metric_name} = failed (metric not in result)", file=sys.stderr)
-                
-                except Exception as e:
-                    error_msg = str(e)
-                    if "rate_limit" in error_msg.lower() or "429" in error_msg:
-                        print(f"    ❌ {metric_name} = rate limit", file=sys.stderr)
-                    else:
-                        print(f"    ❌ {metric_name} = error: {error_msg[:100]}", file=sys.stderr)
-            
-            # Print summary
-            valid_count = sum(1 for v in all_scores.values() if not (isinstance(v, float) and v != v))
-            print(f"\n📈 RAGAS scores ({valid_count}/{len(metrics_config)})", file=sys.stderr)
-            
-            # Normalize context_relevance naming if needed
-            if 'nv_context_relevance' in all_scores:
-                all_scores['context_relevance'] = all_scores.pop('nv_context_relevance')
-            
-            # Build result with all metrics (matching ragas_evaluator.py output format)
-            result = {
-                'faithfulness': all_scores.get('faithfulness', 0.75),
-                'answer_relevancy': all_scores.get('answer_relevancy', 0.75),
-                'context_precision': all_scores.get('context_precision', 0.75),
-                'context_recall': all_scores.get('context_recall', 0.75),
-                'context_relevance': all_scores.get('context_relevance', 0.75),
-                'answer_correctness': all_scores.get('answer_correctness', 0.75)
-            }
+# Neutral scores reported for any metric that could not be evaluated
+_DEFAULTS = {
+    'faithfulness': 0.75,
+    'answer_relevancy': 0.75,
+    'context_precision': 0.75,
+    'context_recall': 0.75,
+    'context_relevance': 0.75,
+    'answer_correctness': 0.75
+}
+
+# Response when RAGAS is not installed, serialized once at import
+_FALLBACK_BODY = orjson.dumps(dict(_DEFAULTS, error='RAGAS not available, using fallback values'))
+
+# LRU of final score payloads keyed by input hash (persists across requests in same container)
+SCORE_CACHE_SIZE = 512
+_score_cache = OrderedDict()
+
+def make_score_cache_key(question: str, answer: str, contexts: list, ground_truth: str, rag_mode: str) -> str:
+    """Hash the evaluation inputs into a compact cache key"""
+    # Contexts keep retrieval order: context_precision is rank-aware
+    payload = json.dumps([question, answer, list(contexts), ground_truth, rag_mode])
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+def store_cached_scores(key: str, result: dict):
+    """Insert a score payload, evicting the least recently used entry when full"""
+    _score_cache[key] = result
+    _score_cache.move_to_end(key)
+    if len(_score_cache) > SCORE_CACHE_SIZE:
+        _score_cache.popitem(last=False)
+
+@functools.lru_cache(maxsize=1)
+def get_embeddings(gemini_api_key: str):
+    """Get the Google embeddings client, reused across requests in same container"""
+    return GoogleGenerativeAIEmbeddings(
+        model="models/embedding-004",
+        google_api_key=gemini_api_key
+    )
+
+@functools.lru_cache(maxsize=None)
+def get_llm(model_name: str, gemini_api_key: str):
+    """Get the RAGAS-wrapped Gemini chat model for a rotated model name, reused across requests"""
+    return LangchainLLMWrapper(ChatGoogleGenerativeAI(
+        model=model_name,
+        google_api_key=gemini_api_key,
+        temperature=0.1,
+        max_output_tokens=16384,  # Matching ragas_evaluator.py
+        convert_system_message_to_human=True,
+        response_mime_type="application/json"
+    ))
+
+def with_llm(metric, llm):
+    """Copy a shared RAGAS metric with its own LLM so concurrent requests can't swap it"""
+    bound = copy.copy(metric)
+    bound.llm = llm
+    return bound
+
+def is_valid_score(raw_score) -> bool:
+    """Check a raw RAGAS score is present and not NaN"""
+    return raw_score is not None and not (isinstance(raw_score, float) and math.isnan(raw_score))
+
+def lookup_raw_score(result, row, name: str):
+    """Read a score straight off a RAGAS result without building a DataFrame"""
+    if row is not None and name in row:
+        return row[name]
+    try:
+        value = result[name]
+    except (KeyError, TypeError, IndexError, AttributeError):
+        return None
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    return value
+
+def extract_metric_score(result, metric_name: str):
+    """Extract a metric score from a RAGAS result, trying known column name variants"""
+    # Column name variations, in priority order
+    possible_names = (
+        metric_name,
+        f"nv_{metric_name}",
+        metric_name.replace('_', ''),
+    )
+    
+    # RAGAS exposes per-row scores via result.scores; read the single row directly
+    try:
+        row = result.scores[0]
+    except (AttributeError, IndexError, KeyError, TypeError):
+        row = None
+    
+    for name in possible_names:
+        raw_score = lookup_raw_score(result, row, name)
+        if is_valid_score(raw_score):
+            if name != metric_name:
+                print(f"    ℹ️  Found as '{name}' in result", file=sys.stderr)
+            return float(raw_score)
+    
+    # Fall back to the DataFrame view only when direct access found nothing
+    if not hasattr(result, 'to_pandas'):
+        return None
+    
+    df = result.to_pandas()
+    present = set(possible_names).intersection(df.columns)
+    
+    for name in possible_names:
+        if name in present:
+            raw_score = df.iat[0, df.columns.get_loc(name)]
+            if is_valid_score(raw_score):
+                if name != metric_name:
+                    print(f"    ℹ️  Found as '{name}' in result", file=sys.stderr)
+                return float(raw_score)
+    
+    return None
+
+async def evaluate_metric(metric_name: str, metric, dataset, embeddings, gemini_api_key: str, semaphore):
+    """Evaluate a single RAGAS metric with the next rotated model.
+    
+    A rate-limited attempt is retried once on the following model in the
+    rotation; a second failure gives the metric up.
+    """
+    async with semaphore:
+        for attempt in range(2):
+            # Get next model in rotation and create LLM
+            current_model = get_next_model()
+            # Configure a per-call copy of the metric with LLM
+            bound_metric = with_llm(metric, get_llm(current_model, gemini_api_key))
+            retry_tag = " (retry)" if attempt else ""
             
-            # Send response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
+            print(f"  📈 {metric_name}: {current_model}{retry_tag}", file=sys.stderr)
+            print(f"PROGRESS: Evaluating {metric_name} with {current_model}{retry_tag}", flush=True)
             
-        except Exception as e:
-            # Error response
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
+            try:
+                # Evaluate this single metric (RAGAS evaluate is blocking, run it off the loop)
+                result = await asyncio.to_thread(
+                    evaluate,
+                    dataset=dataset,
+                    metrics=[bound_metric],
+                    embeddings=embeddings,
+                    show_progress=False
+                )
+            except ResourceExhausted:
+                print(f"    ❌ {metric_name} = rate limit on {current_model}", file=sys.stderr)
+                continue
+            except Exception as e:
+                print(f"    ❌ {metric_name} = error: {str(e)[:100]}", file=sys.stderr)
+                return None
             
-            error_result = {
-                'error': str(e),
-                'faithfulness': 0.75,
-                'answer_relevancy': 0.75,
-                'context_precision': 0.75,
-                'context_recall': 0.75,
-                'context_relevance': 0.75,
-                'answer_correctness': 0.75
-            }
+            # Extract score from RAGAS result
+            score = extract_metric_score(result, metric_name)
             
-            self.wfile.write(json.dumps(error_result).encode())
+            if score is not None:
+                print(f"PROGRESS: {metric_name} completed with score {score:.4f}", flush=True)
+                print(f"    ✅ {metric_name} = {score:.4f}", file=sys.stderr)
+            else:
+                print(f"    ⚠️  {metric_name} = failed (metric not in result)", file=sys.stderr)
+            return score
+        
+        return None
+
+async def evaluate_metrics(metrics_config: list, dataset, embeddings, gemini_api_key: str) -> dict:
+    """Evaluate all configured metrics concurrently, capped at the model rotation width"""
+    semaphore = asyncio.Semaphore(len(_global_model_tracker['models']))
+    scores = await asyncio.gather(*(
+        evaluate_metric(metric_name, metric, dataset, embeddings, gemini_api_key, semaphore)
+        for metric_name, metric in metrics_config
+    ))
+    
+    return {
+        metric_name: score
+        for (metric_name, _), score in zip(metrics_config, scores)
+        if score is not None
+    }
+
+async def evaluate_metrics_fused(metrics_config: list, dataset, embeddings, gemini_api_key: str) -> dict:
+    """Evaluate all metrics in one RAGAS evaluate() call sharing a single LLM.
+    
+    RAGAS parallelizes the metrics internally and embeds the contexts once.
+    Metrics that fail or come back NaN are retried individually with
+    rotated models via evaluate_metrics.
+    """
+    all_scores = {}
+    current_model = get_next_model()
+    
+    try:
+        llm = get_llm(current_model, gemini_api_key)
+        metrics = [with_llm(metric, llm) for _, metric in metrics_config]
+        
+        print(f"PROGRESS: Evaluating {len(metrics)} metrics with {current_model}", flush=True)
+        
+        result = await asyncio.to_thread(
+            evaluate,
+            dataset=dataset,
+            metrics=metrics,
+            embeddings=embeddings,
+            run_config=RunConfig(max_workers=len(_global_model_tracker['models']), timeout=60),
+            show_progress=False
+        )
+        
+        for metric_name, _ in metrics_config:
+            score = extract_metric_score(result, metric_name)
+            if score is not None:
+                assert isinstance(score, float)
+                all_scores[metric_name] = score
+                print(f"    ✅ {metric_name} = {score:.4f}", file=sys.stderr)
+    
+    except Exception as e:
+        print(f"    ❌ fused evaluation error: {str(e)[:100]}", file=sys.stderr)
+    
+    retry_config = [(name, metric) for name, metric in metrics_config if name not in all_scores]
+    if retry_config:
+        print(f"  ↩️  Retrying with model rotation: {', '.join(name for name, _ in retry_config)}", file=sys.stderr)
+        all_scores.update(await evaluate_metrics(retry_config, dataset, embeddings, gemini_api_key))
+    
+    return all_scores
+
+# ASGI app: Vercel's Python runtime awaits requests on a persistent event
+# loop, so the metric fan-out overlaps I/O instead of blocking a worker
+app = FastAPI(default_response_class=ORJSONResponse)
+
+class EvaluationRequest(msgspec.Struct):
+    question: str
+    answer: str
+    contexts: List[str] = []
+    ground_truth: Optional[str] = None
+    rag_mode: str = 'basic'
+
+_request_decoder = msgspec.json.Decoder(EvaluationRequest)
+
+@app.post("/{path:path}")
+async def evaluate_ragas(http_request: Request):
+    """Vercel serverless function handler for RAGAS evaluation"""
+    # Reject malformed bodies before any Gemini quota is spent
+    try:
+        request = _request_decoder.decode(await http_request.body())
+    except msgspec.DecodeError as e:
+        return ORJSONResponse(content={'error': f'Invalid request: {e}'}, status_code=400)
     
-    def do_GET(self):
-        """Health check endpoint"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        
-        health = {
-            'status': 'ok',
-            'ragas_available': RAGAS_AVAILABLE,
-            'service': 'ragas_evaluator'
+    try:
+        question = request.question
+        answer = request.answer
+        contexts = request.contexts
+        ground_truth = request.ground_truth or answer
+        rag_mode = request.rag_mode
+        
+        if not RAGAS_AVAILABLE:
+            # Return fallback metrics
+            return Response(content=_FALLBACK_BODY, media_type='application/json')
+        
+        # Identical inputs were already scored: skip every LLM call
+        cache_key = make_score_cache_key(question, answer, contexts, ground_truth, rag_mode)
+        if cache_key in _score_cache:
+            _score_cache.move_to_end(cache_key)
+            print("♻️  RAGAS score cache hit", file=sys.stderr)
+            return _score_cache[cache_key]
+        
+        # Initialize Gemini LLM for RAGAS with model rotation
+        gemini_api_key = os.environ.get('GEMINI_API_KEY')
+        if not gemini_api_key:
+            raise ValueError('GEMINI_API_KEY environment variable not set')
+        
+        # Google embeddings (lightweight, no large ML models needed)
+        embeddings = get_embeddings(gemini_api_key)
+        
+        # Create dataset for RAGAS
+        dataset_dict = {
+            'question': [question],
+            'answer': [answer],
+            'contexts': [contexts],
+            'ground_truth': [ground_truth]
+        }
+        
+        dataset = Dataset.from_dict(dataset_dict)
+        
+        # Select metrics based on mode (matching ragas_evaluator.py exactly)
+        # Note: answer_correctness added to match Python version
+        if rag_mode == 'advanced':
+            metrics_config = [
+                ('faithfulness', faithfulness),
+                ('answer_relevancy', answer_relevancy),
+                ('context_precision', context_precision),
+                ('context_recall', context_recall),
+                ('answer_correctness', answer_correctness),
+            ]
+        else:  # basic mode - faster metrics
+            metrics_config = [
+                ('faithfulness', faithfulness),
+                ('context_precision', context_precision),
+                ('context_recall', context_recall),
+            ]
+        
+        print(f"📊 Evaluating {len(metrics_config)} RAGAS metrics in one fused evaluate() call...", file=sys.stderr)
+        
+        # One fused evaluation; failed metrics fall back to per-metric model rotation
+        all_scores = await evaluate_metrics_fused(metrics_config, dataset, embeddings, gemini_api_key)
+        
+        # Print summary
+        valid_count = sum(1 for v in all_scores.values() if not math.isnan(v))
+        print(f"\n📈 RAGAS scores ({valid_count}/{len(metrics_config)})", file=sys.stderr)
+        
+        # Normalize context_relevance naming if needed
+        if 'nv_context_relevance' in all_scores:
+            all_scores['context_relevance'] = all_scores.pop('nv_context_relevance')
+        
+        # Build result with all metrics (matching ragas_evaluator.py output format)
+        filtered = {
+            k: v for k, v in all_scores.items()
+            if k in _DEFAULTS and isinstance(v, (int, float)) and not math.isnan(v)
         }
+        result = {**_DEFAULTS, **filtered}
+        
+        # Only cache complete evaluations so rate-limited metrics are retried next time
+        if valid_count == len(metrics_config):
+            store_cached_scores(cache_key, result)
         
-        self.wfile.write(json.dumps(health).encode())
+        return result
+        
+    except Exception as e:
+        # Error response
+        return ORJSONResponse(content=dict(_DEFAULTS, error=str(e)), status_code=500)
+
+@app.get("/{path:path}")
+async def health():
+    """Health check endpoint"""
+    return {
+        'status': 'ok',
+        'ragas_available': RAGAS_AVAILABLE,
+        'service': 'ragas_evaluator'
+    }
@@ -4,7 +4,10 @@ Evaluates each metric separately for more granular and accurate assessment
 """
 
 import os
+import re
 import asyncio
+import hashlib
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 import json
@@ -12,6 +15,15 @@ import json
 # LangChain Core
 from langchain_core.prompts import PromptTemplate
 from langchain_groq import ChatGroq
+from groq import RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+# JSON extraction patterns shared by all metrics
+_FEEDBACK_OBJ = re.compile(r'\{.*?"feedback".*?\}', re.DOTALL)
+_JSON_OBJ = re.compile(r'\{.*?\}', re.DOTALL)
+
+# Maximum number of cached evaluations (responses and individual metrics)
+CACHE_SIZE = 256
 
 @dataclass
 class IndividualMetricResult:
@@ -32,9 +44,16 @@ class ComprehensiveEvaluationResult:
 class IndividualMetricRAGEvaluator:
     """RAG evaluator that assesses each metric individually for higher accuracy"""
     
-    def __init__(self, groq_api_key: str):
-        """Initialize the evaluator with Groq LLM"""
+    def __init__(self, groq_api_key: str, concurrency: int = 4):
+        """Initialize the evaluator with Groq LLM
+        
+        Args:
+            groq_api_key: Groq API key
+            concurrency: Maximum number of metrics evaluated in parallel
+        """
         self.groq_api_key = groq_api_key
+        self.concurrency = concurrency
+        self._cache = OrderedDict()
         self.llm = ChatGroq(
             api_key=groq_api_key,
             model_name="llama-3.1-8b-instant",
@@ -69,27 +88,35 @@ class IndividualMetricRAGEvaluator:
             }
         }
         
-        # Create individual metric prompts
-        self.metric_prompts = self._create_individual_prompts()
-    
-    def _create_individual_prompts(self) -> Dict[str, PromptTemplate]:
-        """Create individual evaluation prompts for each metric"""
-        prompts = {}
+        # Create the shared metric prompt
+        self.base_prompt = self._create_base_prompt()
+        self.chain = self.base_prompt | self.llm
         
-        for metric, details in self.criteria.items():
-            template = f"""
+        # Precompile metric-specific extraction patterns
+        self._metric_object_re = {
+            metric: re.compile(rf'\{{[^{{}}]*"{metric}"[^{{}}]*\}}', re.DOTALL)
+            for metric in self.criteria
+        }
+        self._metric_score_re = {
+            metric: re.compile(rf'"{metric}":\s*([0-9.]+)')
+            for metric in self.criteria
+        }
+    
+    def _create_base_prompt(self) -> PromptTemplate:
+        """Create the evaluation prompt shared by all metrics"""
+        template = """
 You are an expert evaluator for RAG (Retrieval-Augmented Generation) systems.
-You are specifically evaluating the {metric.upper()} metric.
+You are specifically evaluating the {metric_label} metric.
 
-EVALUATION FOCUS: {details['description']}
-SPECIFIC CRITERIA: {details['focus']}
+EVALUATION FOCUS: {description}
+SPECIFIC CRITERIA: {focus}
 
-QUESTION: {{question}}
-CONTEXT: {{context}}
-GENERATED ANSWER: {{prediction}}
-REFERENCE ANSWER: {{reference}}
+QUESTION: {question}
+CONTEXT: {context}
+GENERATED ANSWER: {prediction}
+REFERENCE ANSWER: {reference}
 
-Please evaluate ONLY the {metric.upper()} aspect of the generated answer.
+Please evaluate ONLY the {metric_label} aspect of the generated answer.
 
 Scale: 0.0 to 1.0 (where 1.0 is perfect {metric})
 - 0.0-0.2: Very poor {metric}
@@ -98,21 +125,58 @@ Scale: 0.0 to 1.0 (where 1.0 is perfect {metric})
 - 0.6-0.8: Good {metric}
 - 0.8-1.0: Excellent {metric}
 
-Consider only {details['focus']} in your evaluation.
+Consider only {focus} in your evaluation.
 
 Return ONLY a JSON object:
-{{{{
+{{
     "{metric}": 0.X,
     "feedback": "Specific explanation focused on {metric} aspect only"
-}}}}
+}}
 """
-            
-            prompts[metric] = PromptTemplate(
-                input_variables=["question", "context", "prediction", "reference"],
-                template=template
-            )
         
-        return prompts
+        return PromptTemplate(
+            input_variables=[
+                "metric", "metric_label", "description", "focus",
+                "question", "context", "prediction", "reference"
+            ],
+            template=template
+        )
+    
+    @staticmethod
+    def _make_cache_key(
+        metric_name: Optional[str],
+        question: str,
+        prediction: str,
+        reference: str,
+        context_text: str
+    ) -> bytes:
+        """Hash an evaluation's inputs; metric_name is None for whole responses"""
+        payload = json.dumps([metric_name, question, prediction, reference, context_text], sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+    
+    def _get_cached(self, key: bytes):
+        """Return a cached evaluation and mark it as recently used"""
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        return result
+    
+    def _store_cached(self, key: bytes, result) -> None:
+        """Store an evaluation, evicting the least recently used entry when full"""
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    @retry(
+        retry=retry_if_exception_type(RateLimitError),
+        wait=wait_exponential(multiplier=1, min=1, max=20),
+        stop=stop_after_attempt(5),
+        reraise=True
+    )
+    async def _invoke_chain(self, chain, inputs: Dict[str, str]):
+        """Invoke an evaluation chain, backing off exponentially on Groq 429s"""
+        return await chain.ainvoke(inputs)
     
     async def _evaluate_single_metric(
         self, 
@@ -120,24 +184,26 @@ Return ONLY a JSON object:
         question: str, 
         prediction: str, 
         reference: str, 
-        context: List[str]
+        context_text: str
     ) -> IndividualMetricResult:
-        """Evaluate a single metric individually"""
+        """Evaluate a single metric individually against pre-joined context text"""
+        
+        cache_key = self._make_cache_key(metric_name, question, prediction, reference, context_text)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
         
         start_time = asyncio.get_event_loop().time()
         
         try:
-            # Prepare context text
-            context_text = " ".join(context) if context else "No context provided"
-            
-            # Get the specific prompt for this metric
-            prompt = self.metric_prompts[metric_name]
-            
-            # Create the evaluation chain
-            chain = prompt | self.llm
+            details = self.criteria[metric_name]
             
             # Run evaluation for this specific metric
-            response = await chain.ainvoke({
+            response = await self._invoke_chain(self.chain, {
+                "metric": metric_name,
+                "metric_label": metric_name.upper(),
+                "description": details['description'],
+                "focus": details['focus'],
                 "question": question,
                 "context": context_text,
                 "prediction": prediction,
@@ -148,38 +214,42 @@ Return ONLY a JSON object:
             evaluation_text = response.content.strip()
             
             try:
-                # Extract JSON from response
-                import re
-                
                 print(f"Individual {metric_name} response: {evaluation_text[:100]}...")
                 
-                # Try multiple JSON extraction patterns
-                json_patterns = [
-                    rf'\{{[^{{}}]*"{metric_name}"[^{{}}]*\}}',  # Look for metric-specific structure
-                    r'\{.*?"feedback".*?\}',                   # Alternative pattern
-                    r'\{.*?\}',                               # Most general pattern
-                ]
-                
+                # The prompt asks for a bare JSON object, so try that first
                 evaluation_data = None
-                for pattern in json_patterns:
-                    json_matches = re.findall(pattern, evaluation_text, re.DOTALL)
-                    for match in json_matches:
-                        try:
-                            test_data = json.loads(match)
-                            # Validate that it has our expected structure
-                            if metric_name in test_data or 'feedback' in test_data:
-                                evaluation_data = test_data
-                                print(f"✅ Successfully parsed {metric_name} JSON: {evaluation_data}")
-                                break
-                        except json.JSONDecodeError:
-                            continue
-                    if evaluation_data:
-                        break
+                try:
+                    test_data = json.loads(evaluation_text)
+                    if isinstance(test_data, dict) and (metric_name in test_data or 'feedback' in test_data):
+                        evaluation_data = test_data
+                except json.JSONDecodeError:
+                    pass
                 
+                # Otherwise try multiple JSON extraction patterns
                 if not evaluation_data:
+                    json_patterns = (
+                        self._metric_object_re[metric_name],  # Look for metric-specific structure
+                        _FEEDBACK_OBJ,                        # Alternative pattern
+                        _JSON_OBJ,                            # Most general pattern
+                    )
+                    for pattern in json_patterns:
+                        for match in pattern.findall(evaluation_text):
+                            try:
+                                test_data = json.loads(match)
+                                # Validate that it has our expected structure
+                                if metric_name in test_data or 'feedback' in test_data:
+                                    evaluation_data = test_data
+                                    break
+                            except json.JSONDecodeError:
+                                continue
+                        if evaluation_data:
+                            break
+                
+                if evaluation_data:
+                    print(f"✅ Successfully parsed {metric_name} JSON: {evaluation_data}")
+                else:
                     # Fallback: try to extract score using regex
-                    score_pattern = rf'"{metric_name}":\s*([0-9.]+)'
-                    match = re.search(score_pattern, evaluation_text)
+                    match = self._metric_score_re[metric_name].search(evaluation_text)
                     if match:
                         score = float(match.group(1))
                         evaluation_data = {metric_name: score, 'feedback': f'{metric_name} evaluation completed'}
@@ -195,12 +265,15 @@ Return ONLY a JSON object:
                 
                 evaluation_time = asyncio.get_event_loop().time() - start_time
                 
-                return IndividualMetricResult(
+                result = IndividualMetricResult(
                     metric_name=metric_name,
                     score=score,
                     feedback=feedback,
                     evaluation_time=evaluation_time
                 )
+                # Only successful evaluations are cached so failures get retried
+                self._store_cached(cache_key, result)
+                return result
                 
             except (json.JSONDecodeError, KeyError, ValueError) as e:
                 print(f"Error parsing {metric_name} evaluation response: {e}")
@@ -231,24 +304,31 @@ Return ONLY a JSON object:
     ) -> ComprehensiveEvaluationResult:
         """Evaluate response using individual metric assessments"""
         
+        # Join the context once and share it across all metric evaluations
+        context_text = " ".join(context) if context else "No context provided"
+        
+        cache_key = self._make_cache_key(None, question, prediction, reference, context_text)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
         start_time = asyncio.get_event_loop().time()
         
-        # Evaluate each metric individually
-        individual_results = {}
+        # Evaluate all metrics concurrently; rate limits are handled by retry backoff
+        semaphore = asyncio.Semaphore(self.concurrency)
         
-        for metric_name in self.criteria.keys():
-            print(f"  📊 Evaluating {metric_name}...")
-            
-            # Add small delay between evaluations to avoid rate limits
-            if individual_results:  # Not the first metric
-                await asyncio.sleep(2.0)
-            
-            metric_result = await self._evaluate_single_metric(
-                metric_name, question, prediction, reference, context
-            )
-            individual_results[metric_name] = metric_result
-            
-            print(f"    ✅ {metric_name}: {metric_result.score:.3f}")
+        async def run(metric_name: str) -> IndividualMetricResult:
+            async with semaphore:
+                print(f"  📊 Evaluating {metric_name}...")
+                metric_result = await self._evaluate_single_metric(
+                    metric_name, question, prediction, reference, context_text
+                )
+                print(f"    ✅ {metric_name}: {metric_result.score:.3f}")
+                return metric_result
+        
+        metric_names = list(self.criteria.keys())
+        results = await asyncio.gather(*(run(metric_name) for metric_name in metric_names))
+        individual_results = dict(zip(metric_names, results))
         
         # Calculate overall score from individual metrics
         valid_scores = [result.score for result in individual_results.values() if result.score > 0.0]
@@ -256,12 +336,21 @@ Return ONLY a JSON object:
         
         total_time = asyncio.get_event_loop().time() - start_time
         
-        return ComprehensiveEvaluationResult(
+        result = ComprehensiveEvaluationResult(
             overall_score=overall_score,
             individual_metrics=individual_results,
             total_evaluation_time=total_time,
             evaluation_method='individual_metrics'
         )
+        
+        # Cache the response only if every metric evaluated successfully
+        if all(
+            self._make_cache_key(metric_name, question, prediction, reference, context_text) in self._cache
+            for metric_name in metric_names
+        ):
+            self._store_cached(cache_key, result)
+        
+        return result
     
     def get_criteria_scores(self, evaluation_result: ComprehensiveEvaluationResult) -> Dict[str, float]:
         """Extract criteria scores in compatible format"""
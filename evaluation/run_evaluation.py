@@ -5,6 +5,7 @@ Orchestrates all evaluation frameworks: RAGAS, Spotlight, and LangChain
 """
 
 import asyncio
+import logging
 import os
 import sys
 import argparse
@@ -114,6 +115,8 @@ class ComprehensiveRAGEvaluationSuite:
         except Exception as e:
             print(f"❌ RAGAS evaluation failed: {e}")
             return None
+        finally:
+            await self.ragas_evaluator.aclose()
     
     async def run_langchain_evaluation(self) -> List[Any]:
         """Run LangChain-based evaluation"""
@@ -399,6 +402,9 @@ async def main():
     
     args = parser.parse_args()
     
+    # Surface progress logged by the evaluation modules
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     # Check for GROQ API key
     groq_api_key = os.getenv("GROQ_API_KEY")
     if not groq_api_key:
@@ -50,6 +50,10 @@ class SingleTestEvaluator:
         else:
             self.individual_evaluator = None
     
+    async def aclose(self):
+        """Release the wrapped evaluator's HTTP session and caches"""
+        await self.evaluator.aclose()
+    
     def send_result(self, result: Dict[str, Any]):
         """Send result to API interface"""
         try:
@@ -104,7 +108,7 @@ class SingleTestEvaluator:
             test_case = RAGTestCase(
                 question=test_case_data['question'],
                 expected_answer=f"Expected answer for {test_case_data['category']} question about {test_case_data['difficulty']} difficulty",
-                context_keywords=context_keywords,
+                context_keywords=tuple(context_keywords),
                 difficulty=test_case_data['difficulty'],
                 category=test_case_data['category']
             )
@@ -351,7 +355,10 @@ async def main():
         evaluator = SingleTestEvaluator(groq_api_key, rag_endpoint)
         
         # Run single test evaluation
-        success = await evaluator.evaluate_single_test(test_case_data, rag_mode)
+        try:
+            success = await evaluator.evaluate_single_test(test_case_data, rag_mode)
+        finally:
+            await evaluator.aclose()
         
         if not success:
             print("ERROR:Single test evaluation completed with errors")
@@ -37,6 +37,8 @@ async def test_evaluator():
     except Exception as e:
         print(f"❌ Evaluation failed: {e}")
         return False
+    finally:
+        await evaluator.aclose()
 
 if __name__ == "__main__":
     success = asyncio.run(test_evaluator())
@@ -71,6 +71,8 @@ async def test_full_evaluation_chain():
     except Exception as e:
         print(f"❌ Evaluation failed: {e}")
         return False
+    finally:
+        await evaluator.aclose()
 
 if __name__ == "__main__":
     success = asyncio.run(test_full_evaluation_chain())
@@ -37,6 +37,10 @@ class WebRAGEvaluator:
         self.rag_mode = rag_mode  # 'basic' or 'advanced'
         self.evaluator = RAGEvaluator(groq_api_key)
         
+    async def aclose(self):
+        """Release the wrapped evaluator's HTTP session and caches"""
+        await self.evaluator.aclose()
+    
     def send_progress(self, progress: float, status: str):
         """Send progress update to web interface"""
         try:
@@ -450,7 +454,10 @@ async def main():
         web_evaluator = WebRAGEvaluator(groq_api_key, rag_mode=rag_mode)
         
         # Run evaluation with optional category filter and RAG mode
-        success = await web_evaluator.run_web_evaluation(category, rag_mode)
+        try:
+            success = await web_evaluator.run_web_evaluation(category, rag_mode)
+        finally:
+            await web_evaluator.aclose()
         
         if not success:
             print("ERROR:Evaluation completed with errors")
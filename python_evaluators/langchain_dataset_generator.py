@@ -184,11 +184,17 @@ Format as JSON with string values only - NO nested objects, NO arrays, NO struct
             
             # Try to parse as JSON
             try:
-                # Remove markdown code blocks if present
-                if '```json' in content:
-                    content = content.split('```json')[1].split('```')[0].strip()
-                elif '```' in content:
-                    content = content.split('```')[1].split('```')[0].strip()
+                # Remove markdown code blocks if present (slice between fences, no split copies)
+                start = content.find('```json')
+                if start >= 0:
+                    start += len('```json')
+                else:
+                    start = content.find('```')
+                    if start >= 0:
+                        start += len('```')
+                if start >= 0:
+                    end = content.find('```', start)
+                    content = (content[start:end] if end >= 0 else content[start:]).strip()
                 
                 feedback = json.loads(content)
                 